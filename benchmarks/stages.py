@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark suite with stored JSON baselines.
+
+Times every stage of the task pipeline separately, across a matrix of
+object counts, image sizes and video on/off:
+
+    positions         TaskGenerator._generate_positions
+    task_data         TaskGenerator._generate_task_data (includes positions)
+    signature         TaskGenerator._get_task_signature
+    render_initial    TaskGenerator._render_initial_state
+    render_final      TaskGenerator._render_final_state          (on the rendered scene)
+    animation_frames  TaskGenerator._create_counting_animation_frames  (video only,
+                      reusing the first/final images as render_task does)
+    encode_video      VideoGenerator.create_video_from_frames          (video only)
+    write             OutputWriter.write_task_pair
+
+Usage:
+    python benchmarks/stages.py                          # print results
+    python benchmarks/stages.py --save-baseline local    # store baselines/local.json
+    python benchmarks/stages.py --baseline local         # compare, exit 1 on regression
+    python benchmarks/stages.py --quick --baseline local --tolerance 0.3
+
+Baselines are machine specific: record them on the hardware the
+comparison will run on. ``baselines/reference.json`` is the committed
+reference (its ``meta`` records the machine): regression checks on that
+machine type compare against it with ``--baseline reference``, and it is
+re-recorded there with ``--save-baseline reference`` whenever a change
+is meant to alter stage timings.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+OBJECT_COUNTS = [1, 10, 20]
+IMAGE_SIZES = [256, 512, 1024]
+VIDEO_SETTINGS = [False, True]
+
+QUICK_OBJECT_COUNTS = [1, 20]
+QUICK_IMAGE_SIZES = [512]
+
+
+def time_call(fn: Callable[[], object], repeat: int, min_sample_s: float = 0.005) -> Dict[str, float]:
+    """
+    Time ``fn``; return per-call min and median over ``repeat`` samples in ms.
+
+    Fast stages are looped inside each sample until it lasts ``min_sample_s``
+    so sub-millisecond timings are not dominated by timer noise.
+    """
+    fn()  # warm-up: caches, lazy imports, font lookup
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_s or number >= 1000:
+            break
+        number *= 10
+
+    samples = [elapsed / number * 1000]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    return {"min_ms": round(min(samples), 4), "median_ms": round(statistics.median(samples), 4)}
+
+
+def case_key(num_objects: int, image_size: int, video: bool) -> str:
+    return f"n={num_objects},size={image_size},video={'on' if video else 'off'}"
+
+
+def bench_case(num_objects: int, image_size: int, video: bool, repeat: int, out_dir: Path) -> Dict[str, dict]:
+    """Benchmark every stage for one point of the matrix."""
+    from core import OutputWriter, TaskPair
+    from src.config import TaskConfig
+    from src.generator import TaskGenerator
+    from src.prompts import get_prompt
+
+    config = TaskConfig(
+        num_samples=1,
+        random_seed=0,
+        image_size=(image_size, image_size),
+        min_objects=num_objects,
+        max_objects=num_objects,
+        generate_videos=video,
+        output_dir=out_dir,
+    )
+    generator = TaskGenerator(config)
+    writer = OutputWriter(out_dir)
+
+    random.seed(0)
+    task_data = generator._generate_task_data(task_type="circle")
+    first_image = generator._render_initial_state(task_data)
+    final_image = generator._render_final_state(task_data, scene=first_image)
+
+    stages = {
+        "positions": lambda: generator._generate_positions(num_objects),
+        "task_data": lambda: generator._generate_task_data(task_type="circle"),
+        "signature": lambda: generator._get_task_signature(task_data),
+        "render_initial": lambda: generator._render_initial_state(task_data),
+        "render_final": lambda: generator._render_final_state(task_data, scene=first_image),
+    }
+
+    video_path = None
+    if video and generator.video_generator is not None:
+        def animation_frames():
+            return generator._create_counting_animation_frames(
+                task_data, base_frame=first_image, final_frame=final_image
+            )
+
+        frames = animation_frames()
+        video_path = out_dir / "bench_video.mp4"
+        stages["animation_frames"] = animation_frames
+        stages["encode_video"] = lambda: generator.video_generator.create_video_from_frames(frames, video_path)
+        generator.video_generator.create_video_from_frames(frames, video_path)
+
+    pair = TaskPair(
+        task_id="bench_0000",
+        domain=config.domain,
+        prompt=get_prompt("default", "circle", task_data=task_data),
+        first_image=first_image,
+        final_image=final_image,
+        ground_truth_video=str(video_path) if video_path else None,
+    )
+    stages["write"] = lambda: writer.write_task_pair(pair)
+
+    return {name: time_call(fn, repeat) for name, fn in stages.items()}
+
+
+def run_suite(object_counts: List[int], image_sizes: List[int], videos: List[bool], repeat: int) -> dict:
+    from core.video_utils import VideoGenerator
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for video in videos:
+            if video and not VideoGenerator.is_available():
+                print("⚠️  opencv-python not installed: skipping video cases")
+                continue
+            for image_size in image_sizes:
+                for num_objects in object_counts:
+                    key = case_key(num_objects, image_size, video)
+                    results[key] = bench_case(num_objects, image_size, video, repeat, Path(tmp))
+                    summary = "  ".join(f"{s}={v['median_ms']:.2f}" for s, v in results[key].items())
+                    print(f"{key:<28} {summary}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu": _cpu_model(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _cpu_model() -> str:
+    """CPU model name (from /proc/cpuinfo where available)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    tolerance: float,
+    metric: str = "min_ms",
+    min_delta_ms: float = 0.05,
+) -> List[str]:
+    """
+    Return a line per stage that is slower than baseline by more than ``tolerance``.
+
+    Differences below ``min_delta_ms`` are treated as noise.
+    """
+    regressions = []
+    for key, stages in current["results"].items():
+        base_stages = baseline["results"].get(key)
+        if base_stages is None:
+            continue
+        for stage, timing in stages.items():
+            base = base_stages.get(stage)
+            if base is None or base[metric] <= 0:
+                continue
+            ratio = timing[metric] / base[metric]
+            if ratio > 1 + tolerance and timing[metric] - base[metric] > min_delta_ms:
+                regressions.append(
+                    f"{key} {stage}: {timing[metric]:.3f} ms vs baseline {base[metric]:.3f} ms "
+                    f"({(ratio - 1) * 100:+.0f}%)"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-stage generator benchmarks")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed samples per stage")
+    parser.add_argument("--quick", action="store_true", help="Run a reduced matrix")
+    parser.add_argument("--no-video", action="store_true", help="Skip video cases")
+    parser.add_argument("--output", type=str, default=None, help="Write results JSON here")
+    parser.add_argument("--save-baseline", type=str, default=None, metavar="NAME",
+                        help="Store results as benchmarks/baselines/NAME.json")
+    parser.add_argument("--baseline", type=str, default=None, metavar="NAME_OR_PATH",
+                        help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before a stage counts as regressed (default: 0.25)")
+    parser.add_argument("--metric", choices=["min_ms", "median_ms"], default="min_ms",
+                        help="Timing compared against the baseline (default: min_ms)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Ignore slowdowns smaller than this many ms (default: 0.05)")
+    args = parser.parse_args()
+
+    object_counts = QUICK_OBJECT_COUNTS if args.quick else OBJECT_COUNTS
+    image_sizes = QUICK_IMAGE_SIZES if args.quick else IMAGE_SIZES
+    videos = [False] if args.no_video else VIDEO_SETTINGS
+
+    current = run_suite(object_counts, image_sizes, videos, args.repeat)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2))
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(current, indent=2))
+        print(f"Saved baseline to {path}")
+
+    if args.baseline:
+        path = Path(args.baseline)
+        if not path.exists():
+            path = BASELINE_DIR / f"{args.baseline}.json"
+        baseline = json.loads(path.read_text())
+        recorded = baseline.get("meta", {})
+        if (recorded.get("cpu"), recorded.get("cpu_count")) != (current["meta"]["cpu"], current["meta"]["cpu_count"]):
+            print(f"⚠️  Baseline recorded on {recorded.get('cpu', 'unknown CPU')} x{recorded.get('cpu_count', '?')}, "
+                  f"running on {current['meta']['cpu']} x{current['meta']['cpu_count']}: timings may not be comparable")
+        regressions = compare(current, baseline, args.tolerance, args.metric, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget check for the generation CLI.
+
+Each scenario runs in a fresh interpreter so import costs are measured
+exactly as a short CLI invocation or a spawned worker process sees them.
+The best of ``--repeat`` runs is compared against a per-scenario budget,
+and the runs that must never touch OpenCV are checked for a cv2 import.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 10 --scale 2.0
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (python snippet, budget in milliseconds, must not import cv2)
+SCENARIOS = {
+    "import_core": ("import core", 60, True),
+    "import_cli": ("import src.cli", 60, True),
+    "cli_help": (
+        "import sys\n"
+        "from src.cli import main\n"
+        "try:\n"
+        "    main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n",
+        80,
+        True,
+    ),
+    "spec_only": (
+        "from src.config import TaskConfig\n"
+        "from src.generator import TaskGenerator\n"
+        "gen = TaskGenerator(TaskConfig(num_samples=1, generate_videos=False, random_seed=0))\n"
+        "gen._generate_task_data('circle')\n",
+        600,
+        True,
+    ),
+    "no_videos_run": (
+        "import sys\n"
+        "from src.cli import main\n"
+        "main(['--num-samples', '1', '--seed', '0', '--no-videos', '--output', sys.argv[1]])\n",
+        900,
+        True,
+    ),
+}
+
+CV2_PROBE = "\nimport sys as _s\nprint('CV2_LOADED=' + str('cv2' in _s.modules))\n"
+
+
+def run_scenario(snippet: str, out_dir: str) -> tuple:
+    """Run one snippet in a fresh interpreter; return (seconds, cv2_loaded)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", snippet + CV2_PROBE, out_dir],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"scenario failed:\n{proc.stderr}")
+    return elapsed, "CV2_LOADED=True" in proc.stdout
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check CLI startup-time budgets")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (best is kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # Interpreter start-up itself is not ours to optimise: measure and subtract it
+    baseline = min(run_scenario("pass", "")[0] for _ in range(args.repeat))
+
+    results = {}
+    failed = False
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name, (snippet, budget_ms, forbid_cv2) in SCENARIOS.items():
+            runs = [run_scenario(snippet, out_dir) for _ in range(args.repeat)]
+            best_ms = (min(t for t, _ in runs) - baseline) * 1000
+            cv2_loaded = any(loaded for _, loaded in runs)
+            limit_ms = budget_ms * args.scale
+            ok = best_ms <= limit_ms and not (forbid_cv2 and cv2_loaded)
+            failed |= not ok
+            results[name] = {
+                "best_ms": round(best_ms, 1),
+                "budget_ms": limit_ms,
+                "cv2_loaded": cv2_loaded,
+                "ok": ok,
+            }
+            status = "ok" if ok else "FAIL"
+            note = " (imported cv2)" if forbid_cv2 and cv2_loaded else ""
+            print(f"{name:<16} {best_ms:8.1f} ms  budget {limit_ms:7.1f} ms  {status}{note}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,19 +3,35 @@ Core utilities for template-data-generator.
 
 DO NOT MODIFY - This is framework code.
 Customize files in src/ for your task.
+
+Submodules are imported lazily on first attribute access so that
+``import core`` stays cheap: short CLI invocations and spawned worker
+processes only pay for the backends (pydantic, cv2, numpy) they use.
 """
 
-from .base_generator import BaseGenerator, GenerationConfig
-from .schemas import TaskPair
-from .image_utils import ImageRenderer
-from .output_writer import OutputWriter
-from .video_utils import VideoGenerator
-
-__all__ = [
-    "BaseGenerator",
-    "GenerationConfig",
-    "TaskPair",
-    "ImageRenderer",
-    "OutputWriter",
-    "VideoGenerator",
-]
+import importlib
+
+_EXPORTS = {
+    "BaseGenerator": ".base_generator",
+    "GenerationConfig": ".base_generator",
+    "TaskPair": ".schemas",
+    "ImageRenderer": ".image_utils",
+    "OutputWriter": ".output_writer",
+    "VideoGenerator": ".video_utils",
+    "Metrics": ".metrics",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,121 @@
+"""Content-addressed cache of generated artifacts (PNG, MP4) for incremental runs."""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ArtifactCache:
+    """
+    Store artifacts under a hash of exactly the inputs they depend on.
+
+    ``key(...)`` hashes a canonical JSON encoding of the inputs; callers
+    choose them (task spec, pixel-relevant config fields, renderer version)
+    so that a setting which does not change an artifact does not change its
+    key. Entries are immutable files at ``root/<ab>/<key>``. ``fetch`` places
+    an entry in the output tree as a hardlink (a copy across filesystems),
+    ``store`` adds a freshly written output file the same way, so a
+    repeated run costs a link per unchanged artifact.
+
+    Because outputs and cache entries may share an inode, outputs must be
+    replaced (unlinked and rewritten), never modified in place.
+
+    Entries may be deleted at any time (by hand, or a cleanup job).
+    ``pin`` links entries to private files under ``root/.pins`` so that a
+    task found in the cache at render time is still complete when it is
+    written; ``adopt`` moves each pin into the output tree. Pins left over
+    from an aborted run can be deleted whenever no run is active.
+    """
+
+    def __init__(self, root: Path, link: bool = True):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.link = link
+
+    @staticmethod
+    def key(artifact: str, *parts, **inputs) -> str:
+        """Hash an artifact name and its inputs (JSON-serialisable values)."""
+        payload = json.dumps(
+            [artifact, parts, inputs], sort_keys=True, separators=(",", ":"), default=list
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def contains(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Place the cached artifact at ``dest``; False on a cache miss."""
+        src = self.path(key)
+        if not src.exists():
+            return False
+        try:
+            self._place(src, Path(dest))
+        except FileNotFoundError:
+            return False  # evicted concurrently
+        return True
+
+    def pin(self, keys: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        Pin the entries of ``keys`` (artifact name -> key): name -> pin file.
+
+        All or nothing: None, with no pins left behind, if any entry is missing.
+        """
+        pins_dir = self.root / ".pins"
+        pins_dir.mkdir(exist_ok=True)
+        pinned = {}
+        try:
+            for name, key in keys.items():
+                pin = pins_dir / f"{uuid.uuid4().hex}-{name}"
+                self._place(self.path(key), pin)
+                pinned[name] = str(pin)
+        except FileNotFoundError:
+            for pin in pinned.values():
+                os.unlink(pin)
+            return None
+        return pinned
+
+    @staticmethod
+    def adopt(pin: str, dest: Path) -> None:
+        """Move the pin file ``pin`` to ``dest`` (copied across filesystems)."""
+        try:
+            os.replace(pin, dest)
+        except OSError:
+            tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                shutil.copyfile(pin, tmp)
+                os.replace(tmp, dest)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+            os.unlink(pin)
+
+    def store(self, key: str, src: Path) -> None:
+        """Add the file ``src`` under ``key`` (no-op if already cached)."""
+        dest = self.path(key)
+        if dest.exists():
+            return
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        self._place(Path(src), dest)
+
+    def _place(self, src: Path, dest: Path) -> None:
+        """Atomically make ``dest`` a link to (or copy of) ``src``."""
+        tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            if self.link:
+                try:
+                    os.link(src, tmp)
+                except OSError:  # other filesystem, or links unsupported
+                    shutil.copyfile(src, tmp)
+            else:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
@@ -3,12 +3,16 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from .schemas import TaskPair
+from .progress import ProgressReporter
 
 
 class GenerationConfig(BaseModel):
     """Generation configuration."""
+    # Build the validator on first use rather than at import time
+    model_config = ConfigDict(defer_build=True)
+
     num_samples: int
     domain: str
     difficulty: Optional[str] = None
@@ -22,23 +26,30 @@ class BaseGenerator(ABC):
     
     def __init__(self, config: GenerationConfig):
         self.config = config
-        if config.random_seed is not None:
+        self.reseed()
+    
+    def reseed(self) -> None:
+        """Seed the global random state from ``config.random_seed`` (if set)."""
+        if self.config.random_seed is not None:
             import random
             import numpy as np
-            random.seed(config.random_seed)
-            np.random.seed(config.random_seed)
+            random.seed(self.config.random_seed)
+            np.random.seed(self.config.random_seed)
     
     @abstractmethod
     def generate_task_pair(self, task_id: str) -> TaskPair:
         """Generate a single task. Implement this in your generator."""
         pass
     
-    def generate_dataset(self) -> List[TaskPair]:
-        """Generate complete dataset."""
+    def generate_dataset(self, progress: Optional[ProgressReporter] = None) -> List[TaskPair]:
+        """Generate complete dataset, reporting progress at a fixed interval."""
+        reporter = progress or ProgressReporter(total=self.config.num_samples)
         pairs = []
         for i in range(self.config.num_samples):
             task_id = f"{self.config.domain}_{i:04d}"
             pair = self.generate_task_pair(task_id)
             pairs.append(pair)
-            print(f"  Generated: {task_id}")
+            reporter.advance()
+        if progress is None:
+            reporter.close()
         return pairs
@@ -0,0 +1,213 @@
+"""SQLite catalog of written tasks: one row per task, queryable without walking the output tree."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    domain      TEXT NOT NULL,
+    task_id     TEXT NOT NULL,
+    task_type   TEXT,
+    num_objects INTEGER,
+    seed        INTEGER,
+    signature   TEXT,
+    task_dir    TEXT NOT NULL,      -- relative to the catalog's directory
+    bytes       INTEGER NOT NULL,   -- total size of the task's artifacts
+    metadata    TEXT,               -- JSON: remaining task metadata
+    written_at  REAL NOT NULL,
+    PRIMARY KEY (domain, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tasks_type_count ON tasks (task_type, num_objects);
+CREATE INDEX IF NOT EXISTS tasks_count ON tasks (num_objects);
+CREATE INDEX IF NOT EXISTS tasks_signature ON tasks (signature);
+
+-- Histograms, e.g. feature 'shape', value 'star', count 12
+CREATE TABLE IF NOT EXISTS task_features (
+    domain  TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    value   TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (domain, task_id, feature, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS task_features_value ON task_features (feature, value, count);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    domain   TEXT NOT NULL,
+    task_id  TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    path     TEXT NOT NULL,         -- relative to the catalog's directory
+    size     INTEGER NOT NULL,
+    sha256   TEXT NOT NULL,
+    PRIMARY KEY (domain, task_id, name)
+) WITHOUT ROWID;
+"""
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TaskCatalog:
+    """
+    One row per written task in ``tasks``, its histograms in
+    ``task_features`` and its files (size, SHA-256) in ``artifacts``.
+
+    ``add`` is thread-safe and cheap: rows are buffered and inserted in
+    one transaction per ``batch`` tasks (and on ``flush``/``close``), in
+    WAL mode so readers can query a catalog while it is being written.
+    Rewriting a task replaces its rows. Tasks buffered when a run crashes
+    are missing from the catalog but not from the output tree.
+
+    Subsets are plain SQL, e.g. stars with 15-20 objects::
+
+        SELECT t.task_dir FROM tasks t JOIN task_features f USING (domain, task_id)
+        WHERE f.feature = 'shape' AND f.value = 'star' AND t.num_objects BETWEEN 15 AND 20
+
+    or ``select(shape="star", min_objects=15, max_objects=20)``.
+    """
+
+    def __init__(self, path: Path, batch: int = 256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.root = self.path.parent
+        self.batch = batch
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def add(
+        self,
+        domain: str,
+        task_id: str,
+        task_dir: Path,
+        files: Iterable[Path],
+        metadata: Optional[dict] = None,
+    ) -> None:
+        """
+        Record a written task and its ``files``.
+
+        ``metadata`` may hold ``task_type``, ``num_objects``, ``seed``,
+        ``signature`` and ``features`` (``{feature: {value: count}}``);
+        other keys are kept as JSON.
+        """
+        metadata = dict(metadata or {})
+        features = metadata.pop("features", {})
+        artifacts = []
+        for path in files:
+            path = Path(path)
+            artifacts.append((path.name, self._relative(path), path.stat().st_size, file_sha256(path)))
+        row = (
+            domain, task_id,
+            metadata.pop("task_type", None), metadata.pop("num_objects", None),
+            metadata.pop("seed", None), metadata.pop("signature", None),
+            self._relative(task_dir), sum(size for _, _, size, _ in artifacts),
+            json.dumps(metadata, sort_keys=True) if metadata else None, time.time(),
+        )
+        with self._lock:
+            self._pending.append((row, features, artifacts))
+            if len(self._pending) >= self.batch:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        keys = [(row[0], row[1]) for row, _, _ in pending]
+        with self._connection:  # one transaction
+            self._connection.executemany("DELETE FROM task_features WHERE domain = ? AND task_id = ?", keys)
+            self._connection.executemany("DELETE FROM artifacts WHERE domain = ? AND task_id = ?", keys)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row for row, _, _ in pending],
+            )
+            self._connection.executemany(
+                "INSERT INTO task_features VALUES (?, ?, ?, ?, ?)",
+                [
+                    (domain, task_id, feature, str(value), count)
+                    for (domain, task_id), (_, features, _) in zip(keys, pending)
+                    for feature, histogram in features.items()
+                    for value, count in histogram.items()
+                ],
+            )
+            self._connection.executemany(
+                "INSERT INTO artifacts VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (domain, task_id, *artifact)
+                    for (domain, task_id), (_, _, artifacts) in zip(keys, pending)
+                    for artifact in artifacts
+                ],
+            )
+
+    def select(
+        self,
+        task_type: Optional[str] = None,
+        min_objects: Optional[int] = None,
+        max_objects: Optional[int] = None,
+        limit: Optional[int] = None,
+        **features: str,
+    ) -> List[Path]:
+        """
+        Task directories matching every filter.
+
+        Keyword filters match histogram values, e.g. ``shape="star"`` or
+        ``color="#ff6464"``.
+        """
+        sql = ["SELECT t.task_dir FROM tasks t"]
+        where, params = [], []
+        for i, (feature, value) in enumerate(sorted(features.items())):
+            sql.append(f"JOIN task_features f{i} ON f{i}.domain = t.domain AND f{i}.task_id = t.task_id "
+                       f"AND f{i}.feature = ? AND f{i}.value = ?")
+            params += [feature, str(value)]
+        for clause, value in (("t.task_type = ?", task_type), ("t.num_objects >= ?", min_objects),
+                              ("t.num_objects <= ?", max_objects)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY t.domain, t.task_id")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(" ".join(sql), params).fetchall()
+        return [self.root / task_dir for (task_dir,) in rows]
+
+    def execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query against the catalog (after flushing buffered tasks)."""
+        self.flush()
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def __len__(self) -> int:
+        return self.execute("SELECT COUNT(*) FROM tasks")[0][0]
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+    def _relative(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return str(path.relative_to(self.root))
+        except ValueError:
+            return str(path)
@@ -0,0 +1,152 @@
+"""Shared-memory ring of fixed-size frame slots for moving pixels between processes."""
+
+import os
+import threading
+import weakref
+from collections import deque
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SHM_DIR = "/dev/shm"
+
+
+def available_shm_bytes() -> Optional[int]:
+    """Free space backing shared memory, or None if it cannot be determined."""
+    try:
+        stat = os.statvfs(SHM_DIR)
+    except (AttributeError, OSError):
+        return None
+    return stat.f_bavail * stat.f_frsize
+
+
+class FrameRing:
+    """
+    A pool of ``(height, width, 3)`` uint8 frame slots in one shared segment.
+
+    A slot can also hold any smaller frame (e.g. a lower resolution of the
+    same task); readers pass its shape to ``view``.
+
+    The creating (parent) process owns slot bookkeeping: it leases slots with
+    ``try_acquire`` before handing a job to a worker, and returns them with
+    ``release`` once the frames have been consumed, or when the job failed
+    (including a crashed worker). Workers never allocate; they ``attach``
+    by spec and ``write`` into the slots they were given, so a dying worker
+    cannot leave a slot marked as taken. The segment is unlinked by
+    ``close()``, at interpreter exit, or by the multiprocessing resource
+    tracker if the parent itself dies.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, int, int], slots: int, _attach: Optional[str] = None):
+        self.frame_shape = tuple(frame_shape)
+        self.frame_bytes = int(np.prod(self.frame_shape))
+        self.slots = slots
+        self.owner = _attach is None
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.frame_bytes * slots)
+        else:
+            self._shm = shared_memory.SharedMemory(name=_attach)
+        self._array = np.ndarray((slots, *self.frame_shape), dtype=np.uint8, buffer=self._shm.buf)
+        self._free = deque(range(slots))
+        self._lock = threading.Lock()
+        self.peak_in_use = 0
+        self._finalizer = weakref.finalize(self, _close_segment, self._shm, self.owner)
+
+    @classmethod
+    def create(
+        cls,
+        frame_shape: Tuple[int, int, int],
+        max_bytes: int,
+        min_slots: int = 1,
+    ) -> Optional["FrameRing"]:
+        """
+        Create a ring of at most ``max_bytes`` (capped by free shared memory).
+
+        Returns None if fewer than ``min_slots`` frames would fit or the
+        segment cannot be created; callers then fall back to pickling.
+        """
+        free = available_shm_bytes()
+        if free is not None:
+            max_bytes = min(max_bytes, free // 2)
+        slots = max_bytes // int(np.prod(frame_shape))
+        if slots < max(1, min_slots):
+            return None
+        try:
+            return cls(frame_shape, slots)
+        except OSError:
+            return None
+
+    @classmethod
+    def attach(cls, spec: tuple) -> "FrameRing":
+        """Open an existing ring in a worker from ``ring.spec``."""
+        name, frame_shape, slots = spec
+        return cls(frame_shape, slots, _attach=name)
+
+    @property
+    def spec(self) -> tuple:
+        """Picklable description used by ``attach``."""
+        return self._shm.name, self.frame_shape, self.slots
+
+    # ── slot leases (owning process only) ────────────────────────────────────
+
+    @property
+    def in_use(self) -> int:
+        return self.slots - len(self._free)
+
+    def try_acquire(self, count: int) -> Optional[List[int]]:
+        """Lease ``count`` slots, or return None if not enough are free."""
+        with self._lock:
+            if count > len(self._free):
+                return None
+            leased = [self._free.popleft() for _ in range(count)]
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            return leased
+
+    def release(self, slots: List[int]) -> None:
+        """Return leased slots to the pool."""
+        with self._lock:
+            self._free.extend(slots)
+
+    # ── pixel access ─────────────────────────────────────────────────────────
+
+    def fits(self, shape: Tuple[int, ...]) -> bool:
+        """Whether a uint8 frame of ``shape`` fits in one slot."""
+        return int(np.prod(shape)) <= self.frame_bytes
+
+    def write(self, slot: int, frame) -> None:
+        """Copy an RGB frame (PIL image or array, at most ``frame_shape``) into ``slot``."""
+        array = np.asarray(frame, dtype=np.uint8)
+        self._slot(slot, array.shape)[...] = array
+
+    def view(self, slot: int, shape: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+        """
+        Read-only array view of ``slot`` (valid until the slot is released).
+
+        ``shape`` reads a smaller frame written with that shape.
+        """
+        view = self._slot(slot, shape)
+        view.flags.writeable = False
+        return view
+
+    def _slot(self, slot: int, shape: Optional[Tuple[int, ...]]) -> np.ndarray:
+        if shape is None or tuple(shape) == self.frame_shape:
+            return self._array[slot]
+        return self._array[slot].reshape(-1)[:int(np.prod(shape))].reshape(shape)
+
+    def close(self) -> None:
+        """Detach, and unlink the segment if this process created it."""
+        self._array = None
+        self._finalizer()
+
+
+def _close_segment(shm: shared_memory.SharedMemory, unlink: bool) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        pass  # a view is still alive; the mapping goes away with the process
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
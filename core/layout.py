@@ -0,0 +1,124 @@
+"""Task directory layouts: flat ``{domain}_task/<id>/`` or hashed fan-out ``{domain}_task/ab/cd/<id>/``."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+MANIFEST = "layout.json"
+
+
+class TaskLayout:
+    """
+    Stable mapping from task ID to its directory under ``{domain}_task/``.
+
+    The flat layout (``levels=0``) keeps every task directly in the domain
+    directory. The hashed layout nests each task under ``levels`` bucket
+    directories named by successive ``width``-character slices of the MD5
+    hex digest of its ID, e.g. ``3f/a2/<task_id>`` for the default 2 x 2,
+    so no directory holds more than ``16 ** width`` buckets and tasks are
+    spread evenly whatever their IDs look like.
+
+    A hashed tree records its layout in ``{domain}_task/layout.json``;
+    ``TaskLayout.read`` loads it (a tree without one is flat), so readers
+    resolve IDs with one file read per tree and no directory scans.
+    """
+
+    def __init__(self, levels: int = 0, width: int = 2):
+        if levels < 0 or not 1 <= width <= 4 or levels * width > 32:
+            raise ValueError(f"Invalid task layout: levels={levels}, width={width}")
+        self.levels = levels
+        self.width = width
+
+    @classmethod
+    def parse(cls, text: str) -> "TaskLayout":
+        """``"flat"``, ``"hashed"`` (2 levels of 2) or ``"hashed:LEVELS[xWIDTH]"``."""
+        name, _, spec = text.strip().lower().partition(":")
+        if name == "flat" and not spec:
+            return cls()
+        if name == "hashed":
+            levels, _, width = (spec or "2").partition("x")
+            return cls(int(levels), int(width or 2))
+        raise ValueError(f"Unknown task layout {text!r}; expected flat, hashed or hashed:LEVELS[xWIDTH]")
+
+    @classmethod
+    def read(cls, domain_dir: Path) -> "TaskLayout":
+        """The layout of an existing ``{domain}_task`` directory (flat without a manifest)."""
+        path = Path(domain_dir) / MANIFEST
+        if not path.exists():
+            return cls()
+        manifest = json.loads(path.read_text())
+        if manifest.get("hash") != "md5":
+            raise ValueError(f"{path}: unsupported task layout hash {manifest.get('hash')!r}")
+        return cls(int(manifest["levels"]), int(manifest["width"]))
+
+    @property
+    def hashed(self) -> bool:
+        return self.levels > 0
+
+    def to_dict(self) -> dict:
+        return {"layout": "hashed" if self.hashed else "flat", "hash": "md5", "levels": self.levels, "width": self.width}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TaskLayout) and (self.levels, self.width) == (other.levels, other.width)
+
+    def __repr__(self) -> str:
+        return f"TaskLayout(levels={self.levels}, width={self.width})"
+
+    def __str__(self) -> str:
+        return f"hashed:{self.levels}x{self.width}" if self.hashed else "flat"
+
+    def buckets(self, task_id: str) -> str:
+        """Relative bucket path of ``task_id`` (empty for the flat layout)."""
+        if not self.hashed:
+            return ""
+        digest = hashlib.md5(task_id.encode()).hexdigest()
+        w = self.width
+        return "/".join(digest[i * w:(i + 1) * w] for i in range(self.levels))
+
+    def task_dir(self, domain_dir: Path, task_id: str) -> Path:
+        """Directory of ``task_id`` under ``domain_dir``."""
+        if not self.hashed:
+            return Path(domain_dir) / task_id
+        return Path(domain_dir) / self.buckets(task_id) / task_id
+
+    def iter_task_dirs(self, domain_dir: Path) -> Iterator[Path]:
+        """Every task directory under ``domain_dir`` (skipping staging and bucket directories)."""
+        pattern = "/".join(["*"] * (self.levels + 1))
+        for path in sorted(Path(domain_dir).glob(pattern)):
+            if path.is_dir() and not path.name.startswith("."):
+                yield path
+
+    def expected_buckets(self, tasks: int) -> float:
+        """Expected number of bucket directories holding ``tasks`` uniformly hashed tasks."""
+        total = 0.0
+        for level in range(1, self.levels + 1):
+            count = 16 ** (self.width * level)
+            total += count * (1 - (1 - 1 / count) ** tasks)
+        return total
+
+    def write_manifest(self, domain_dir: Path) -> None:
+        """
+        Record the layout in ``domain_dir`` (hashed layouts only).
+
+        Raises ValueError if the directory already uses another layout, so
+        one tree never mixes layouts.
+        """
+        domain_dir = Path(domain_dir)
+        existing = TaskLayout.read(domain_dir)
+        if existing == self:
+            return
+        if existing.hashed:
+            raise ValueError(f"{domain_dir} uses the {existing} task layout, not {self}")
+        if domain_dir.exists() and any(
+            path.is_dir() and not path.name.startswith(".") for path in domain_dir.iterdir()
+        ):
+            raise ValueError(f"{domain_dir} uses the flat task layout, not {self}")
+        domain_dir.mkdir(parents=True, exist_ok=True)
+        (domain_dir / MANIFEST).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def find_task_dir(output_dir: Path, domain: str, task_id: str, layout: Optional[TaskLayout] = None) -> Path:
+    """Directory of ``task_id`` in an output tree, whichever layout it was written with."""
+    domain_dir = Path(output_dir) / f"{domain}_task"
+    return (layout or TaskLayout.read(domain_dir)).task_dir(domain_dir, task_id)
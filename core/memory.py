@@ -0,0 +1,244 @@
+"""Memory budget: process-tree RSS sampling, per-stage peaks and in-flight throttling."""
+
+import multiprocessing
+import os
+import re
+import threading
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+from .metrics import Metrics
+
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as ``"512M"``, ``"4G"``, ``"1.5GiB"`` or ``"1048576"``."""
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([kmgt]?)(i?b)?\s*", str(text).lower())
+    if not match:
+        raise ValueError(f"Invalid size {text!r}; expected e.g. 512M or 4G")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def format_size(size: float) -> str:
+    return f"{size / (1 << 20):.0f} MiB"
+
+
+def process_memory(pid: Optional[int] = None, proportional: bool = True) -> Optional[int]:
+    """
+    Resident memory of one process in bytes, or None if unavailable.
+
+    With ``proportional`` the proportional set size is used where the
+    kernel reports it, so pages shared between processes (libraries, the
+    shared-memory frame ring) are split between them rather than counted
+    once per process. It costs about a millisecond for a large process;
+    plain RSS is a few microseconds.
+    """
+    proc = f"/proc/{pid or 'self'}"
+    if proportional:
+        try:
+            with open(f"{proc}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    try:
+        with open(f"{proc}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if pid is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        # Peak rather than current RSS, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+def tree_memory() -> int:
+    """Memory of this process plus its live multiprocessing children (e.g. a render pool)."""
+    total = process_memory() or 0
+    for child in multiprocessing.active_children():
+        total += process_memory(child.pid) or 0
+    return total
+
+
+class _StageScope:
+    """Stage context recording the stage's memory peak into a ``StageMemory``."""
+
+    __slots__ = ("_owner", "_name", "_traced")
+
+    def __init__(self, owner: "StageMemory", name: str):
+        self._owner = owner
+        self._name = name
+        self._traced = False
+
+    def __enter__(self) -> "_StageScope":
+        self._traced = self._owner._should_trace(self._name)
+        if self._traced:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        traced = None
+        if self._traced:
+            traced = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._owner._end_trace()
+        self._owner.record(self._name, process_memory(proportional=False), traced)
+        return False
+
+
+class StageMemory:
+    """
+    Stage hook recording peak memory per stage in this process.
+
+    Two numbers are kept per stage: the process's resident set size at the
+    end of the stage (a high-water mark over all calls) and the peak
+    Python/numpy allocation during the stage measured with ``tracemalloc``.
+    Pixel buffers allocated inside PIL are outside ``tracemalloc``'s view
+    and only show up in the resident figure. Tracing slows allocation, so
+    only every ``trace_every``-th call of each stage is traced (0 disables
+    it), and a call is skipped while another thread is tracing.
+
+    Register it with ``metrics.add_stage_hook(memory)``. Worker processes
+    send ``take()`` to the parent, which folds it in with ``merge()``.
+    """
+
+    def __init__(self, trace_every: int = 16):
+        self.trace_every = trace_every
+        self._calls: Dict[str, int] = {}
+        self._peaks: Dict[str, list] = {}  # stage -> [resident, traced]
+        self._lock = threading.Lock()
+        self._tracing = False  # a stage of this process holds the tracemalloc slot
+
+    def stage(self, name: str) -> _StageScope:
+        return _StageScope(self, name)
+
+    def _should_trace(self, name: str) -> bool:
+        if not self.trace_every:
+            return False
+        with self._lock:
+            calls = self._calls.get(name, 0)
+            self._calls[name] = calls + 1
+            if calls % self.trace_every or self._tracing or tracemalloc.is_tracing():
+                return False
+            # Claimed before the lock is released, so no other thread starts tracing
+            self._tracing = True
+            return True
+
+    def _end_trace(self) -> None:
+        with self._lock:
+            self._tracing = False
+
+    def record(self, name: str, resident: Optional[int], traced: Optional[int]) -> None:
+        with self._lock:
+            peak = self._peaks.setdefault(name, [0, 0])
+            peak[0] = max(peak[0], resident or 0)
+            peak[1] = max(peak[1], traced or 0)
+
+    def peaks(self) -> Dict[str, dict]:
+        """``{stage: {"resident": bytes, "traced": bytes}}``."""
+        with self._lock:
+            return {
+                name: {"resident": resident, "traced": traced}
+                for name, (resident, traced) in sorted(self._peaks.items())
+            }
+
+    def take(self) -> Dict[str, dict]:
+        """Return the peaks recorded so far and start over (worker side)."""
+        peaks = self.peaks()
+        with self._lock:
+            self._peaks.clear()
+        return peaks
+
+    def merge(self, peaks: Dict[str, dict]) -> None:
+        for name, peak in peaks.items():
+            self.record(name, peak["resident"], peak["traced"])
+
+
+class MemoryGovernor:
+    """
+    Keep the process tree under a memory budget by scaling concurrency.
+
+    ``update()`` samples this process and its children at most every
+    ``interval`` seconds. Above ``high`` of the budget the concurrency
+    scale is halved, below ``low`` it grows back additively, so
+    the in-flight task limit and queue bounds handed out by ``limit()``
+    back off fast and recover slowly. A scale of 1 means the configured
+    limits. The budget is soft: work that is already in flight finishes.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        metrics: Optional[Metrics] = None,
+        high: float = 0.85,
+        low: float = 0.7,
+        interval: float = 0.25,
+        stages: Optional[StageMemory] = None,
+    ):
+        self.budget = budget
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.high = high
+        self.low = low
+        self.interval = interval
+        self.stages = stages
+        self.scale = 1.0
+        self.min_scale = 1.0
+        self.current = 0
+        self.peak = 0
+        self.throttled = 0
+        self._last = 0.0
+
+    def update(self, force: bool = False) -> float:
+        """Sample memory if due (or ``force``) and return the current concurrency scale."""
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return self.scale
+        self._last = now
+        self.current = tree_memory()
+        self.peak = max(self.peak, self.current)
+        if self.current > self.high * self.budget:
+            if self.scale > 0.01:
+                self.throttled += 1
+            self.scale = max(0.01, self.scale / 2)
+        elif self.current < self.low * self.budget:
+            self.scale = min(1.0, self.scale + 0.1)
+        self.min_scale = min(self.min_scale, self.scale)
+        return self.scale
+
+    def limit(self, nominal: int) -> int:
+        """``nominal`` scaled down to the current budget headroom (at least 1)."""
+        return max(1, int(nominal * self.scale))
+
+    def record(self) -> None:
+        """Export peaks as gauges (``memory_*`` and ``stage_memory_peak_bytes``)."""
+        self.update(force=True)
+        self.metrics.gauge("memory_budget_bytes", self.budget)
+        self.metrics.gauge("memory_peak_bytes", self.peak)
+        self.metrics.gauge("memory_throttle_events", self.throttled)
+        self.metrics.gauge("memory_min_concurrency_scale", self.min_scale)
+        if self.stages is not None:
+            for stage, peak in self.stages.peaks().items():
+                for kind, value in peak.items():
+                    self.metrics.gauge("stage_memory_peak_bytes", value, stage=stage, kind=kind)
+
+    def summary(self) -> str:
+        """One human-readable line for the end-of-run report."""
+        text = f"peak {format_size(self.peak)} of {format_size(self.budget)} budget"
+        if self.throttled:
+            text += f", throttled {self.throttled}x (down to {self.min_scale:.0%} concurrency)"
+        if self.stages is not None:
+            stages = self.stages.peaks()
+            if stages:
+                text += "; per stage (resident/traced): " + ", ".join(
+                    f"{name} {format_size(p['resident'])}/{format_size(p['traced'])}"
+                    for name, p in stages.items()
+                )
+        return text
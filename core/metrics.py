@@ -0,0 +1,332 @@
+"""Lightweight metrics: counters, histograms and stage timers."""
+
+import bisect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+# Histogram bucket upper bounds for durations in seconds (Prometheus style)
+DEFAULT_TIME_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """Fixed-bucket histogram with sum, count, min and max."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "min", "max")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(b) for b in self.bounds] + ["+Inf"], self.counts)),
+        }
+
+    def merge(self, data: dict) -> None:
+        for i, n in enumerate(data["buckets"].values()):
+            self.counts[i] += n
+        if data["count"]:
+            self.sum += data["sum"]
+            self.count += data["count"]
+            self.min = min(self.min, data["min"])
+            self.max = max(self.max, data["max"])
+
+
+class _Timer:
+    """Context manager observing elapsed wall time into a histogram."""
+
+    __slots__ = ("_metrics", "_name", "_labels", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: LabelKey):
+        self._metrics = metrics
+        self._name = name
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._metrics._observe(self._name, self._labels, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    """Shared no-op timer returned while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _HookedStage:
+    """Stage timer that also enters the stage contexts of registered hooks."""
+
+    __slots__ = ("_contexts",)
+
+    def __init__(self, contexts: list):
+        self._contexts = contexts
+
+    def __enter__(self) -> "_HookedStage":
+        for context in self._contexts:
+            context.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        for context in reversed(self._contexts):
+            context.__exit__(*exc)
+        return False
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    """
+    In-process metrics registry.
+
+    Counters, gauges and histograms are keyed by name plus optional labels
+    and may be updated from several threads. When
+    created with ``enabled=False`` every call returns immediately and timers
+    are a shared no-op, so instrumented hot paths cost one attribute check.
+
+    Example:
+        metrics = Metrics()
+        with metrics.stage("render"):
+            ...
+        metrics.incr("placement_attempts_total", 12)
+        metrics.write_json("metrics.json")
+        metrics.write_prometheus("metrics.prom")
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_TIME_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._histograms: Dict[Tuple[str, LabelKey], _Histogram] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._stage_hooks: list = []
+        self._lock = threading.Lock()  # stage threads of a pipeline share one registry
+        self._started = time.time()
+
+    # ── recording ────────────────────────────────────────────────────────────
+
+    def incr(self, name: str, value: float = 1, **labels) -> None:
+        """Add ``value`` to a counter."""
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to its latest value."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation in a histogram."""
+        if not self.enabled:
+            return
+        self._observe(name, _label_key(labels), value)
+
+    def _observe(self, name: str, labels: LabelKey, value: float) -> None:
+        with self._lock:
+            hist = self._histograms.get((name, labels))
+            if hist is None:
+                hist = self._histograms[(name, labels)] = _Histogram(self.buckets)
+            hist.observe(value)
+
+    def timer(self, name: str, **labels):
+        """Context manager timing its block into histogram ``name`` (seconds)."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, _label_key(labels))
+
+    def stage(self, name: str):
+        """Time one pipeline stage (data, signature, render, video, write)."""
+        if self._stage_hooks:
+            contexts = [hook.stage(name) for hook in self._stage_hooks]
+            if self.enabled:
+                contexts.insert(0, _Timer(self, "stage_seconds", (("stage", name),)))
+            return _HookedStage(contexts)
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, "stage_seconds", (("stage", name),))
+
+    def add_stage_hook(self, hook) -> None:
+        """
+        Register an object whose ``stage(name)`` context manager is entered
+        around every stage, e.g. a ``core.profiling.StageProfiler``.
+        Hooks run even when the registry itself is disabled.
+        """
+        self._stage_hooks.append(hook)
+
+    # ── export ───────────────────────────────────────────────────────────────
+
+    def snapshot(self, reset: bool = False) -> dict:
+        """
+        Return all metrics as a JSON-serialisable dict.
+
+        With ``reset=True`` counters and histograms are cleared afterwards,
+        so a worker process can ship deltas to the parent's ``merge()``.
+        """
+        with self._lock:
+            snap = {
+                "started_at": self._started,
+                "elapsed_seconds": time.time() - self._started,
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._gauges.items())
+                ],
+                "histograms": [
+                    {"name": name, "labels": dict(labels), **hist.to_dict()}
+                    for (name, labels), hist in sorted(self._histograms.items(), key=lambda kv: kv[0])
+                ],
+            }
+            if reset:
+                self._counters.clear()
+                self._histograms.clear()
+        return snap
+
+    def merge(self, snapshot: dict) -> None:
+        """Fold a snapshot (e.g. from a worker process) into this registry."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for c in snapshot["counters"]:
+                key = (c["name"], _label_key(c["labels"]))
+                self._counters[key] = self._counters.get(key, 0) + c["value"]
+            for g in snapshot.get("gauges", []):
+                self._gauges[(g["name"], _label_key(g["labels"]))] = g["value"]
+            for h in snapshot["histograms"]:
+                key = (h["name"], _label_key(h["labels"]))
+                hist = self._histograms.get(key)
+                if hist is None:
+                    hist = self._histograms[key] = _Histogram(self.buckets)
+                hist.merge(h)
+
+    def write_json(self, path: Path) -> Path:
+        """Write the JSON summary."""
+        return _atomic_write(Path(path), json.dumps(self.snapshot(), indent=2))
+
+    def to_prometheus(self, prefix: str = "") -> str:
+        """Render metrics in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+
+        def fmt(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+            items = list(labels) + ([extra] if extra else [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in items) + "}"
+
+        # Copy under the lock (pipeline threads keep recording), format outside it
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = [
+                (key, hist.bounds, list(hist.counts), hist.sum, hist.count)
+                for key, hist in sorted(self._histograms.items(), key=lambda kv: kv[0])
+            ]
+
+        for (name, labels), value in counters:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{fmt(labels)} {value}")
+
+        for (name, labels), value in gauges:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} gauge")
+                typed.add(metric)
+            lines.append(f"{metric}{fmt(labels)} {value}")
+
+        for (name, labels), bounds, counts, total, count in histograms:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, n in zip([str(b) for b in bounds] + ["+Inf"], counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{fmt(labels, ('le', bound))} {cumulative}")
+            lines.append(f"{metric}_sum{fmt(labels)} {total}")
+            lines.append(f"{metric}_count{fmt(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path, prefix: str = "") -> Path:
+        """Write a node_exporter textfile-collector file."""
+        return _atomic_write(Path(path), self.to_prometheus(prefix))
+
+
+def _escape_label(value) -> str:
+    """Escape a label value for the Prometheus text format (backslash, quote, newline)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: Path, text: str) -> Path:
+    """Write via a temp file and rename so readers never see partial output."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+    return path
@@ -1,47 +1,335 @@
 """Output writer for standard format."""
 
+import json
+import os
 import shutil
+import threading
+import uuid
 from pathlib import Path
-from typing import List
-from .schemas import TaskPair
+from typing import Dict, List, NamedTuple, Optional
+from .artifact_cache import ArtifactCache
+from .catalog import TaskCatalog
+from .schemas import ImagePayload, TaskPair
 from .image_utils import ImageRenderer
+from .layout import TaskLayout
+from .metrics import Metrics
+
+
+class _StagedTask(NamedTuple):
+    """A task written to its staging directory, waiting to be renamed into place."""
+    task_pair: TaskPair
+    staging_dir: Path
+    task_dir: Path
+    names: List[str]  # Artifact file names, in write order
 
 
 class OutputWriter:
-    """Writes tasks to standard folder structure."""
+    """
+    Writes tasks to standard folder structure.
+    
+    Each task is written to a hidden staging directory next to its final
+    one (``.<task_id>.<random>.staging``) and renamed into place once
+    complete, so a crash never leaves a partially written task directory.
+    Rewriting an existing task first moves the old one aside
+    (``.<task_id>.<random>.old``); a crash between the two renames leaves
+    neither in place. ``prepare`` (called before a domain is first written)
+    recovers from both: it restores an ``.old`` task whose directory is
+    missing and deletes leftover staging and ``.old`` directories, so only
+    one writer may use a tree at a time. With ``fsync_every=N`` tasks are
+    also made durable in groups: every N staged tasks have their files and
+    directories fsynced in one pass, then are renamed into place and the
+    parent directories are fsynced (up to the output directory, for bucket
+    directories created by the group), so a task that is visible after a
+    power loss is complete. Staged tasks become visible at the end of
+    their group, or on ``flush()``/``close()``.
+    
+    ``layout`` places task directories under ``{domain}_task/`` (flat, or
+    hashed fan-out buckets recorded in ``layout.json``; see ``core.layout``).
+    By default an existing tree keeps the layout it was written with and a
+    new one is flat.
     
-    def __init__(self, output_dir: Path):
+    With an ``ArtifactCache``, artifacts named in ``TaskPair.artifact_keys``
+    are linked from the cache when present and added to it when written.
+    With a ``TaskCatalog``, every committed task is recorded in it.
+    """
+    
+    def __init__(
+        self,
+        output_dir: Path,
+        metrics: Optional[Metrics] = None,
+        cache: Optional[ArtifactCache] = None,
+        catalog: Optional[TaskCatalog] = None,
+        fsync_every: int = 0,
+        layout: Optional[TaskLayout] = None,
+    ):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.cache = cache
+        self.catalog = catalog
+        self.fsync_every = fsync_every
+        self.layout = layout
+        self._layouts: Dict[str, TaskLayout] = {}  # Domain -> layout of its directory
+        self._pending: List[_StagedTask] = []
+        self._durable_dirs = set()  # Directories whose entry in their parent has been fsynced
+        self._lock = threading.Lock()
     
     def write_task_pair(self, task_pair: TaskPair) -> Path:
-        """Write single task to disk."""
-        task_dir = self.output_dir / f"{task_pair.domain}_task" / task_pair.task_id
+        """Write single task to disk (committed now, or with its fsync group)."""
+        task_dir = self.task_dir(task_pair.domain, task_pair.task_id)
+        staging_dir = task_dir.with_name(f".{task_pair.task_id}.{uuid.uuid4().hex[:12]}.staging")
+        with self.metrics.stage("write"):
+            written = self._write_files(task_pair, staging_dir)
+            if not self.fsync_every:
+                _replace_dir(staging_dir, task_dir)
+        staged = _StagedTask(task_pair, staging_dir, task_dir, [path.name for path in written])
+        if not self.fsync_every:
+            self._committed([staged])
+            return task_dir
+        with self._lock:
+            self._pending.append(staged)
+            if len(self._pending) < self.fsync_every:
+                return task_dir
+            group, self._pending = self._pending, []
+        self._commit(group)
+        return task_dir
+    
+    def task_dir(self, domain: str, task_id: str) -> Path:
+        """Directory of a task in this writer's tree."""
+        layout = self._layouts.get(domain) or self.prepare(domain)
+        return layout.task_dir(self.output_dir / f"{domain}_task", task_id)
+    
+    def prepare(self, domain: str) -> TaskLayout:
+        """
+        Resolve (and record) the layout of ``domain``'s directory; ValueError if it uses another one.
+        
+        Also recovers tasks left mid-write by an interrupted run (see the class docstring).
+        """
+        with self._lock:
+            if domain not in self._layouts:
+                domain_dir = self.output_dir / f"{domain}_task"
+                layout = self.layout if self.layout is not None else TaskLayout.read(domain_dir)
+                layout.write_manifest(domain_dir)
+                restored, removed = _recover_interrupted(domain_dir, layout)
+                if restored:
+                    self.metrics.incr("interrupted_tasks_restored_total", restored)
+                if removed:
+                    self.metrics.incr("interrupted_dirs_removed_total", removed)
+                self._layouts[domain] = layout
+            return self._layouts[domain]
+    
+    def flush(self) -> None:
+        """Commit staged tasks that are still waiting for their fsync group."""
+        with self._lock:
+            group, self._pending = self._pending, []
+        if group:
+            self._commit(group)
+    
+    def _commit(self, group: List[_StagedTask]) -> None:
+        """Fsync a group of staged tasks, rename them into place and fsync their parents."""
+        with self.metrics.stage("fsync"):
+            for staged in group:
+                for name in staged.names:
+                    _fsync(staged.staging_dir / name)
+                _fsync(staged.staging_dir)
+            for staged in group:
+                _replace_dir(staged.staging_dir, staged.task_dir)
+            # The task entries live in their parents; bucket (and domain)
+            # directories the group may have created are entries in theirs
+            parents, created = set(), []
+            with self._lock:
+                durable = set(self._durable_dirs)
+            for staged in group:
+                directory = staged.task_dir.parent
+                parents.add(directory)
+                while directory != self.output_dir and directory not in durable:
+                    parents.add(directory.parent)
+                    created.append(directory)
+                    durable.add(directory)
+                    directory = directory.parent
+            for parent in parents:
+                _fsync(parent)
+            with self._lock:
+                self._durable_dirs.update(created)
+        self.metrics.incr("fsync_groups_total")
+        self._committed(group)
+    
+    def _committed(self, group: List[_StagedTask]) -> None:
+        """Count and catalog tasks that are now in place."""
+        for staged in group:
+            written = [staged.task_dir / name for name in staged.names]
+            if self.metrics.enabled:
+                self._record_sizes(written)
+            if self.catalog is not None:
+                pair = staged.task_pair
+                with self.metrics.stage("catalog"):
+                    self.catalog.add(pair.domain, pair.task_id, staged.task_dir, written, pair.metadata)
+    
+    def _write_files(self, task_pair: TaskPair, task_dir: Path) -> List[Path]:
+        """Write every artifact of one task; return the paths written."""
         task_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        reused = self._fetch_cached(task_pair, task_dir)
+        
+        # Write images (encoded payloads as they are)
+        path = task_dir / "first_frame.png"
+        if path.name not in reused:
+            if task_pair.payload("first_image") is None:
+                raise ValueError(f"{task_pair.task_id}: first frame neither rendered nor pinned in the cache")
+            self._write_image(task_pair.payload("first_image"), path, rgb=True)
+        written.append(path)
+        
+        if task_pair.payload("final_image") is not None or "final_frame.png" in reused:
+            path = task_dir / "final_frame.png"
+            if path.name not in reused:
+                self._write_image(task_pair.payload("final_image"), path, rgb=True)
+            written.append(path)
         
-        # Write images
-        ImageRenderer.ensure_rgb(task_pair.first_image).save(task_dir / "first_frame.png")
+        # Write instance annotations if provided (object ID buffer + boxes)
+        if task_pair.payload("instance_ids") is not None or "instance_ids.png" in reused:
+            path = task_dir / "instance_ids.png"
+            if path.name not in reused:
+                self._write_image(task_pair.payload("instance_ids"), path)
+            written.append(path)
         
-        if task_pair.final_image:
-            ImageRenderer.ensure_rgb(task_pair.final_image).save(task_dir / "final_frame.png")
+        if task_pair.annotations is not None or "annotations.json" in reused:
+            path = task_dir / "annotations.json"
+            if path.name not in reused:
+                self._fresh(path).write_text(json.dumps(task_pair.annotations))
+            written.append(path)
         
         # Write goal.txt if provided (for tasks with text answers)
         if task_pair.goal_text:
-            (task_dir / "goal.txt").write_text(task_pair.goal_text)
+            path = task_dir / "goal.txt"
+            self._fresh(path).write_text(task_pair.goal_text)
+            written.append(path)
         
         # Write prompt
-        (task_dir / "prompt.txt").write_text(task_pair.prompt)
+        path = task_dir / "prompt.txt"
+        self._fresh(path).write_text(task_pair.prompt)
+        written.append(path)
         
         # Write video if provided (preserve original extension)
-        if task_pair.ground_truth_video and Path(task_pair.ground_truth_video).exists():
-            video_src = Path(task_pair.ground_truth_video)
-            video_ext = video_src.suffix  # .mp4 or .avi
-            shutil.copy(video_src, task_dir / f"ground_truth{video_ext}")
+        cached_video = next((name for name in reused if name.startswith("ground_truth")), None)
+        if cached_video:
+            written.append(task_dir / cached_video)
+        elif isinstance(task_pair.ground_truth_video, bytes):
+            path = task_dir / f"ground_truth{task_pair.video_ext}"
+            self._fresh(path).write_bytes(task_pair.ground_truth_video)
+            written.append(path)
+        elif task_pair.ground_truth_video and Path(task_pair.ground_truth_video).exists():
+            path = task_dir / f"ground_truth{task_pair.video_ext}"  # .mp4 or .avi
+            shutil.copy(task_pair.ground_truth_video, self._fresh(path))
+            written.append(path)
         
-        return task_dir
+        if self.cache is not None and task_pair.artifact_keys:
+            for path in written:
+                key = task_pair.artifact_keys.get(path.name)
+                if key and path.name not in reused:
+                    self.cache.store(key, path)
+        
+        return written
+    
+    def _write_image(self, payload: ImagePayload, path: Path, rgb: bool = False) -> None:
+        if isinstance(payload, bytes):
+            self._fresh(path).write_bytes(payload)
+        else:
+            (ImageRenderer.ensure_rgb(payload) if rgb else payload).save(self._fresh(path))
+    
+    def _fetch_cached(self, task_pair: TaskPair, task_dir: Path) -> Dict[str, Path]:
+        """Place pinned and cached artifacts in ``task_dir``; return those reused by name."""
+        reused = {}
+        for name, pin in (task_pair.cached_files or {}).items():
+            path = task_dir / name
+            ArtifactCache.adopt(pin, path)
+            reused[name] = path
+            self.metrics.incr("artifact_cache_total", artifact=path.stem, result="hit")
+        if self.cache is None or not task_pair.artifact_keys:
+            return reused
+        for name, key in task_pair.artifact_keys.items():
+            if name in reused:
+                continue
+            path = task_dir / name
+            hit = self.cache.fetch(key, path)
+            if hit:
+                reused[name] = path
+            self.metrics.incr("artifact_cache_total", artifact=path.stem, result="hit" if hit else "miss")
+        return reused
+    
+    def _fresh(self, path: Path) -> Path:
+        """Unlink an existing output first: it may be a hardlink into the cache."""
+        if self.cache is not None:
+            path.unlink(missing_ok=True)
+        return path
+    
+    def _record_sizes(self, written: List[Path]) -> None:
+        """Count bytes written per artifact (only called when metrics are on)."""
+        self.metrics.incr("tasks_written_total")
+        for path in written:
+            artifact = path.stem
+            self.metrics.incr("bytes_written_total", path.stat().st_size, artifact=artifact)
+            self.metrics.incr("artifacts_written_total", artifact=artifact)
     
     def write_dataset(self, task_pairs: List[TaskPair]) -> Path:
         """Write all tasks to disk."""
         for pair in task_pairs:
             self.write_task_pair(pair)
+        self.flush()
         return self.output_dir
+    
+    def close(self) -> None:
+        """Commit staged tasks and close the catalog, if any."""
+        self.flush()
+        if self.catalog is not None:
+            self.catalog.close()
+
+
+def _fsync(path: Path) -> None:
+    """Flush a file's or directory's data and metadata to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_dir(src: Path, dest: Path) -> None:
+    """Rename the directory ``src`` to ``dest``, replacing an existing ``dest``."""
+    try:
+        os.rename(src, dest)
+        return
+    except OSError:
+        if not dest.exists():
+            raise
+    # A rerun over an existing task: move the old one aside first. Until
+    # the second rename ``dest`` is missing; OutputWriter.prepare restores
+    # the ``.old`` task if a crash happens in between
+    old = dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:12]}.old")
+    os.rename(dest, old)
+    os.rename(src, dest)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def _recover_interrupted(domain_dir: Path, layout: TaskLayout) -> tuple:
+    """
+    Clean up after a run that stopped mid-write in ``domain_dir``.
+
+    ``.<task_id>.<random>.old`` directories whose task directory is missing
+    (a crash between the two renames of ``_replace_dir``) are renamed back;
+    every other ``.old`` and ``.staging`` directory is deleted. Returns the
+    numbers of restored tasks and deleted directories.
+    """
+    restored = removed = 0
+    pattern = "/".join(["*"] * layout.levels + [".*"])
+    for path in sorted(Path(domain_dir).glob(pattern)):
+        name = path.name
+        if not path.is_dir() or not name.endswith((".staging", ".old")):
+            continue
+        task_dir = path.with_name(name[1:].rsplit(".", 2)[0])
+        if name.endswith(".old") and not task_dir.exists():
+            os.rename(path, task_dir)
+            restored += 1
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return restored, removed
@@ -0,0 +1,317 @@
+"""Staged render → encode → write pipeline with independently sized pools."""
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .memory import MemoryGovernor
+from .metrics import Metrics
+
+_STOP = object()
+
+
+class _DepthStats:
+    """Running mean/max of one queue's depth, sampled by the coordinator."""
+
+    __slots__ = ("capacity", "samples", "total", "max")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.samples = 0
+        self.total = 0
+        self.max = 0
+
+    def sample(self, depth: int) -> None:
+        self.samples += 1
+        self.total += depth
+        if depth > self.max:
+            self.max = depth
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "mean": self.total / self.samples if self.samples else 0.0,
+            "max": self.max,
+        }
+
+
+class StagedPipeline:
+    """
+    Run jobs through three stages connected by bounded queues.
+
+    - render: ``render_fn(job)`` in a process pool (pure-Python CPU work);
+      ``render_workers=0`` renders in the calling thread instead
+    - encode: ``encode_fn(rendered)`` in a thread pool (video/PNG encoders
+      release the GIL)
+    - write:  ``write_fn(encoded)`` in a thread pool (I/O bound)
+
+    Each stage has its own worker count and queue bound, so the slowest
+    stage can be scaled on its own. A full queue blocks the stage feeding
+    it, which keeps memory bounded. Queue depths are sampled continuously
+    (``depths()``, ``queue_stats()``) and time spent blocked on a full
+    downstream queue or idle on an empty upstream one is recorded as
+    ``pipeline_blocked_seconds_total`` / ``pipeline_idle_seconds_total``,
+    which points at the bottleneck stage.
+
+    With ``batched=True`` each job is a chunk of work: ``render_fn`` returns
+    a list and every element is passed on to the encode stage separately.
+    Chunking amortises per-dispatch overhead for cheap jobs; the in-flight
+    bound then counts chunks.
+
+    ``discard_fn(job)``, if given, is called in the calling thread for every
+    submitted job that did not produce a render result (it raised, its
+    worker died, or the run was aborted first), so resources leased per job
+    can be returned.
+
+    With a ``MemoryGovernor``, the in-flight bound and the encode/write
+    queue bounds are scaled down while the process tree is near its memory
+    budget, and back up as memory is released.
+
+    ``render_fn`` and ``initializer`` must be picklable (module level).
+    """
+
+    def __init__(
+        self,
+        render_fn: Callable[[Any], Any],
+        encode_fn: Callable[[Any], Any],
+        write_fn: Callable[[Any], Any],
+        render_workers: int = 1,
+        encode_workers: int = 1,
+        write_workers: int = 1,
+        queue_size: int = 8,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        mp_context=None,
+        metrics: Optional[Metrics] = None,
+        batched: bool = False,
+        discard_fn: Optional[Callable[[Any], None]] = None,
+        governor: Optional[MemoryGovernor] = None,
+    ):
+        self.render_fn = render_fn
+        self.encode_fn = encode_fn
+        self.write_fn = write_fn
+        self.render_workers = render_workers
+        self.encode_workers = max(1, encode_workers)
+        self.write_workers = max(1, write_workers)
+        self.queue_size = max(1, queue_size)
+        self.initializer = initializer
+        self.initargs = initargs
+        self.mp_context = mp_context
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.batched = batched
+        self.discard_fn = discard_fn
+        self.governor = governor
+
+        # Jobs allowed in the render pool at once (submitted, not yet collected)
+        self.max_in_flight = max(1, render_workers) * 2
+        # Effective bounds, lowered by the governor under memory pressure
+        self._in_flight_limit = self.max_in_flight
+        self._queue_limit = self.queue_size
+        self._encode_q: "queue.Queue" = queue.Queue(self.queue_size)
+        self._write_q: "queue.Queue" = queue.Queue(self.queue_size)
+        self._done_q: "queue.Queue" = queue.Queue()
+        self._in_flight = 0
+        self._error: Optional[BaseException] = None
+        self._stats = {
+            "render": _DepthStats(self.max_in_flight),
+            "encode": _DepthStats(self.queue_size),
+            "write": _DepthStats(self.queue_size),
+        }
+
+    # ── observability ────────────────────────────────────────────────────────
+
+    def depths(self) -> Dict[str, int]:
+        """Current number of items waiting for (or in) each stage."""
+        return {
+            "render": self._in_flight,
+            "encode": self._encode_q.qsize(),
+            "write": self._write_q.qsize(),
+        }
+
+    def queue_stats(self) -> Dict[str, dict]:
+        """Mean/max sampled depth and capacity per stage."""
+        return {stage: stats.to_dict() for stage, stats in self._stats.items()}
+
+    def _sample_depths(self) -> Dict[str, int]:
+        depths = self.depths()
+        for stage, depth in depths.items():
+            self._stats[stage].sample(depth)
+        return depths
+
+    # ── stage workers ────────────────────────────────────────────────────────
+
+    def _put(self, q: "queue.Queue", item: Any, stage: str) -> None:
+        """Blocking put that gives up if another stage has failed."""
+        start = time.perf_counter()
+        while True:
+            if self._error is not None:
+                raise RuntimeError("pipeline aborted") from self._error
+            if q.qsize() >= self._queue_limit:
+                time.sleep(0.01)  # below capacity, but over the memory-governed bound
+                continue
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.metrics.incr("pipeline_blocked_seconds_total", time.perf_counter() - start, stage=stage)
+
+    def _thread_loop(self, in_q: "queue.Queue", fn: Callable, out_q: Optional["queue.Queue"], stage: str) -> None:
+        while True:
+            start = time.perf_counter()
+            item = in_q.get()
+            self.metrics.incr("pipeline_idle_seconds_total", time.perf_counter() - start, stage=stage)
+            if item is _STOP:
+                return
+            if self._error is not None:
+                continue  # drain without working so upstream puts never block
+            try:
+                result = fn(item)
+                if out_q is not None:
+                    self._put(out_q, result, stage)
+                else:
+                    self._done_q.put(result)
+            except BaseException as exc:  # surfaced from run()
+                if self._error is None:
+                    self._error = exc
+
+    # ── coordinator ──────────────────────────────────────────────────────────
+
+    def run(
+        self,
+        jobs: Iterable[Any],
+        on_complete: Optional[Callable[[Any], None]] = None,
+        on_tick: Optional[Callable[[Dict[str, int]], None]] = None,
+    ) -> int:
+        """
+        Push every job through the pipeline; return the number completed.
+
+        ``on_complete(result)`` receives each ``write_fn`` return value and
+        ``on_tick(depths)`` the sampled queue depths; both run in the calling
+        thread. The first exception raised by any stage is re-raised here.
+        """
+        encode_threads = [
+            threading.Thread(
+                target=self._thread_loop, args=(self._encode_q, self.encode_fn, self._write_q, "encode"),
+                name=f"encode-{i}", daemon=True,
+            )
+            for i in range(self.encode_workers)
+        ]
+        write_threads = [
+            threading.Thread(
+                target=self._thread_loop, args=(self._write_q, self.write_fn, None, "write"),
+                name=f"write-{i}", daemon=True,
+            )
+            for i in range(self.write_workers)
+        ]
+        for thread in encode_threads + write_threads:
+            thread.start()
+
+        completed = 0
+
+        def drain_done() -> None:
+            nonlocal completed
+            while True:
+                try:
+                    result = self._done_q.get_nowait()
+                except queue.Empty:
+                    return
+                completed += 1
+                if on_complete is not None:
+                    on_complete(result)
+
+        def tick() -> None:
+            if self.governor is not None:
+                self.governor.update()
+                self._in_flight_limit = self.governor.limit(self.max_in_flight)
+                self._queue_limit = self.governor.limit(self.queue_size)
+            depths = self._sample_depths()
+            drain_done()
+            if on_tick is not None:
+                on_tick(depths)
+
+        executor = None
+        pending: Dict[Future, Any] = {}
+        try:
+            if self.render_workers > 0:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.render_workers,
+                    mp_context=self.mp_context,
+                    initializer=self.initializer,
+                    initargs=self.initargs,
+                )
+            elif self.initializer is not None:
+                self.initializer(*self.initargs)
+
+            job_iter = iter(jobs)
+            exhausted = False
+
+            while not exhausted or pending:
+                if self._error is not None:
+                    break
+                # Keep the render pool fed up to its in-flight bound
+                while not exhausted and len(pending) < self._in_flight_limit:
+                    try:
+                        job = next(job_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if executor is None:
+                        future: Future = Future()
+                        try:
+                            future.set_result(self.render_fn(job))
+                        except Exception as exc:
+                            future.set_exception(exc)
+                    else:
+                        future = executor.submit(self.render_fn, job)
+                    pending[future] = job
+                    self._in_flight = len(pending)
+
+                if pending:
+                    done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = pending.pop(future)
+                        self._in_flight = len(pending)
+                        if future.exception() is not None and self.discard_fn is not None:
+                            self.discard_fn(job)
+                        results = future.result() if self.batched else (future.result(),)
+                        for result in results:
+                            self._put(self._encode_q, result, "render")
+                tick()
+
+            for _ in encode_threads:
+                self._encode_q.put(_STOP)
+            for thread in encode_threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+                    tick()
+            for _ in write_threads:
+                self._write_q.put(_STOP)
+            for thread in write_threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+                    tick()
+            drain_done()
+        except BaseException as exc:
+            if self._error is None:
+                self._error = exc
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=self._error is None, cancel_futures=True)
+            if self.discard_fn is not None:
+                for job in pending.values():
+                    self.discard_fn(job)
+            if self._error is not None:
+                # Unblock and retire the stage threads
+                for q, threads in ((self._encode_q, encode_threads), (self._write_q, write_threads)):
+                    for _ in threads:
+                        try:
+                            q.put_nowait(_STOP)
+                        except queue.Full:
+                            pass
+
+        if self._error is not None:
+            raise self._error
+        return completed
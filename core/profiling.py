@@ -0,0 +1,179 @@
+"""Opt-in per-stage profiling: cProfile stats and sampled collapsed stacks."""
+
+import cProfile
+import io
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class StageProfiler:
+    """
+    Profile pipeline stages (data, render, video, write) for selected tasks.
+
+    Two views are recorded while a selected task is inside a stage:
+
+    - a ``cProfile`` profile per stage, written as ``{stage}.pstats``;
+    - stacks sampled every ``interval`` seconds from a background thread,
+      written as ``stacks.collapsed`` (flamegraph.pl / speedscope format)
+      with the stage name as the root frame.
+
+    Only the first ``first_n`` tasks and/or a random ``fraction`` of tasks
+    are profiled (all tasks if neither is given), so overhead in long runs
+    stays bounded. Attach it with ``Metrics.add_stage_hook(profiler)`` and
+    wrap each task in ``profiler.task(index)``.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        first_n: Optional[int] = None,
+        fraction: Optional[float] = None,
+        interval: float = 0.001,
+        seed: int = 0,
+    ):
+        self.output_dir = Path(output_dir)
+        self.first_n = first_n
+        self.fraction = fraction
+        self.interval = interval
+        self.tasks_profiled = 0
+        self._rng = random.Random(seed)  # independent of the generation RNG
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._stack: List[str] = []
+        self._selected = False
+        self._samples: Counter = Counter()
+        self._sample_thread_id: Optional[int] = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self._sampler = threading.Thread(target=self._sample_loop, name="stage-sampler", daemon=True)
+        self._sampler.start()
+
+    # ── selection ────────────────────────────────────────────────────────────
+
+    def should_profile(self, index: int) -> bool:
+        """Decide whether the task at ``index`` is profiled."""
+        if self.first_n is None and self.fraction is None:
+            return True
+        if self.first_n is not None and index < self.first_n:
+            return True
+        return self.fraction is not None and self._rng.random() < self.fraction
+
+    def task(self, index: int) -> "_TaskScope":
+        """Context manager marking the boundaries of one task."""
+        return _TaskScope(self, self.should_profile(index))
+
+    # ── stage hook ───────────────────────────────────────────────────────────
+
+    def stage(self, name: str) -> "_StageScope":
+        """Context manager profiling one stage of the current task."""
+        return _StageScope(self, name)
+
+    def _enter_stage(self, name: str) -> None:
+        if self._stack:
+            self._profiles[self._stack[-1]].disable()
+        self._stack.append(name)
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        self._sample_thread_id = threading.get_ident()
+        self._wake.set()
+        profile.enable()
+
+    def _exit_stage(self) -> None:
+        name = self._stack.pop()
+        self._profiles[name].disable()
+        if self._stack:
+            self._profiles[self._stack[-1]].enable()
+        else:
+            self._wake.clear()
+
+    # ── sampling ─────────────────────────────────────────────────────────────
+
+    def _sample_loop(self) -> None:
+        while not self._stopped:
+            self._wake.wait()
+            if self._stopped:
+                break
+            frame = sys._current_frames().get(self._sample_thread_id)
+            try:
+                stage = self._stack[-1]
+            except IndexError:  # stage exited between wake-up and sample
+                stage = None
+            if stage is not None and frame is not None:
+                self._samples[self._collapse(stage, frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(stage: str, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+            frame = frame.f_back
+        names.append(stage)
+        return ";".join(reversed(names))
+
+    # ── output ───────────────────────────────────────────────────────────────
+
+    def close(self) -> Path:
+        """Stop sampling and write ``{stage}.pstats``, ``stacks.collapsed`` and ``summary.txt``."""
+        self._stopped = True
+        self._wake.set()
+        self._sampler.join(timeout=1.0)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = io.StringIO()
+        summary.write(f"Profiled tasks: {self.tasks_profiled}\n")
+        for name, profile in sorted(self._profiles.items()):
+            profile.dump_stats(str(self.output_dir / f"{name}.pstats"))
+            summary.write(f"\n═══ stage: {name} ═══\n")
+            pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(15)
+
+        with open(self.output_dir / "stacks.collapsed", "w") as f:
+            for stack, count in sorted(self._samples.items()):
+                f.write(f"{stack} {count}\n")
+        (self.output_dir / "summary.txt").write_text(summary.getvalue())
+        return self.output_dir
+
+
+class _TaskScope:
+    __slots__ = ("_profiler", "_selected", "_previous")
+
+    def __init__(self, profiler: StageProfiler, selected: bool):
+        self._profiler = profiler
+        self._selected = selected
+
+    def __enter__(self) -> bool:
+        self._previous = self._profiler._selected
+        self._profiler._selected = self._selected
+        if self._selected:
+            self._profiler.tasks_profiled += 1
+        return self._selected
+
+    def __exit__(self, *exc) -> bool:
+        self._profiler._selected = self._previous
+        return False
+
+
+class _StageScope:
+    __slots__ = ("_profiler", "_name", "_active")
+
+    def __init__(self, profiler: StageProfiler, name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self) -> "_StageScope":
+        self._active = self._profiler._selected
+        if self._active:
+            self._profiler._enter_stage(self._name)
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        if self._active:
+            self._profiler._exit_stage()
+        return False
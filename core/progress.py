@@ -0,0 +1,270 @@
+"""Rate-limited progress reporting (TTY line, log lines, JSON lines or quiet)."""
+
+import json
+import queue as queue_module
+import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO
+
+MODES = ("auto", "tty", "log", "jsonl", "quiet")
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+class _StageClock:
+    """Stage context manager adding its wall time to an owner's stage sums."""
+
+    __slots__ = ("_owner", "_name", "_start")
+
+    def __init__(self, owner, name: str):
+        self._owner = owner
+        self._name = name
+
+    def __enter__(self) -> "_StageClock":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._owner.add_stage_time(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class ProgressReporter:
+    """
+    Report progress at a fixed interval instead of once per task.
+
+    ``advance()`` is cheap (a counter update and a clock read); output is
+    emitted at most every ``interval`` seconds with the completed count,
+    tasks/s, ETA, per-type completion and mean stage timings over the last
+    interval. Stage timings are collected by registering the reporter as a
+    stage hook: ``metrics.add_stage_hook(reporter)``.
+
+    Modes:
+        tty   - one status line rewritten in place
+        log   - one plain line per interval (default when not on a TTY)
+        jsonl - one JSON object per interval, plus a final ``done`` event
+        quiet - no output
+        auto  - ``tty`` if the stream is a terminal, else ``log``
+
+    Worker processes report through ``worker_handle()`` (hand it to the
+    pool initializer, since multiprocessing queues travel by inheritance);
+    the parent picks their updates up in ``poll()``.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        mode: str = "auto",
+        interval: float = 2.0,
+        totals_by_type: Optional[Dict[str, int]] = None,
+        stream: Optional[TextIO] = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown progress mode {mode!r}; expected one of {MODES}")
+        self.stream = stream if stream is not None else sys.stderr
+        if mode == "auto":
+            mode = "tty" if getattr(self.stream, "isatty", lambda: False)() else "log"
+        self.mode = mode
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.totals_by_type = dict(totals_by_type or {})
+        self.done_by_type: Dict[str, int] = {}
+        self._stage_window: Dict[str, list] = {}
+        self._stage_totals: Dict[str, list] = {}
+        self._start = time.monotonic()
+        self._last_emit = self._start
+        self.queue_depths: Dict[str, int] = {}
+        self._queue = None
+        self._closed = False
+        self._lock = threading.RLock()  # advance/stage may come from pipeline threads
+
+    # ── recording ────────────────────────────────────────────────────────────
+
+    def advance(self, n: int = 1, task_type: Optional[str] = None) -> None:
+        """Mark ``n`` tasks as completed."""
+        with self._lock:
+            self.done += n
+            if task_type is not None:
+                self.done_by_type[task_type] = self.done_by_type.get(task_type, 0) + n
+        self.poll()
+
+    def stage(self, name: str) -> _StageClock:
+        """Stage hook: time one stage into the current reporting window."""
+        return _StageClock(self, name)
+
+    def add_stage_time(self, name: str, seconds: float, count: int = 1) -> None:
+        """Record stage time measured elsewhere (e.g. in a worker)."""
+        with self._lock:
+            entry = self._stage_window.get(name)
+            if entry is None:
+                entry = self._stage_window[name] = [0.0, 0]
+            entry[0] += seconds
+            entry[1] += count
+
+    def set_queue_depths(self, depths: Dict[str, int]) -> None:
+        """Show pipeline queue depths in the next report."""
+        self.queue_depths = dict(depths)
+
+    def worker_handle(self, context=None) -> "WorkerProgress":
+        """Create a picklable handle for worker processes (shares one queue)."""
+        if self._queue is None:
+            if context is None:
+                import multiprocessing
+                context = multiprocessing.get_context()
+            self._queue = context.Queue()
+        return WorkerProgress(self._queue)
+
+    def poll(self) -> None:
+        """Drain worker updates and emit a report if the interval has elapsed."""
+        if self._queue is not None:
+            self._drain()
+        now = time.monotonic()
+        if now - self._last_emit >= self.interval:
+            with self._lock:
+                if now - self._last_emit >= self.interval:
+                    self._emit(now)
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                task_type, stage_sums = self._queue.get_nowait()
+            except queue_module.Empty:
+                return
+            with self._lock:
+                if task_type is not None:
+                    self.done += 1
+                    if task_type:
+                        self.done_by_type[task_type] = self.done_by_type.get(task_type, 0) + 1
+                for name, (seconds, count) in stage_sums.items():
+                    self.add_stage_time(name, seconds, count)
+
+    # ── output ───────────────────────────────────────────────────────────────
+
+    def snapshot(self, now: Optional[float] = None, cumulative: bool = False) -> dict:
+        """
+        Current progress as a dict (the JSON-lines payload).
+
+        Stage timings cover the current window, or the whole run if
+        ``cumulative`` is set.
+        """
+        now = time.monotonic() if now is None else now
+        stages = self._stage_totals if cumulative else self._stage_window
+        elapsed = max(now - self._start, 1e-9)
+        rate = self.done / elapsed
+        remaining = max(self.total - self.done, 0)
+        return {
+            "done": self.done,
+            "total": self.total,
+            "elapsed_seconds": round(elapsed, 3),
+            "tasks_per_second": round(rate, 3),
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+            "by_type": {
+                task_type: {"done": self.done_by_type.get(task_type, 0), "total": total}
+                for task_type, total in self.totals_by_type.items()
+            },
+            "stage_ms": {
+                name: round(seconds / count * 1000, 3)
+                for name, (seconds, count) in sorted(stages.items()) if count
+            },
+            **({"queues": dict(self.queue_depths)} if self.queue_depths else {}),
+        }
+
+    def _emit(self, now: float, final: bool = False) -> None:
+        self._last_emit = now
+        window = self.snapshot(now) if self.mode != "quiet" and not final else None
+        for name, (seconds, count) in self._stage_window.items():
+            total = self._stage_totals.setdefault(name, [0.0, 0])
+            total[0] += seconds
+            total[1] += count
+        self._stage_window.clear()
+        if self.mode == "quiet":
+            return
+        snap = window if window is not None else self.snapshot(now, cumulative=True)
+
+        if self.mode == "jsonl":
+            snap = {"event": "done" if final else "progress", "time": time.time(), **snap}
+            self.stream.write(json.dumps(snap) + "\n")
+            self.stream.flush()
+            return
+
+        pct = 100.0 * snap["done"] / snap["total"] if snap["total"] else 100.0
+        eta = _format_duration(snap["eta_seconds"]) if snap["eta_seconds"] is not None else "?"
+        parts = [f"[{snap['done']}/{snap['total']} {pct:5.1f}%] {snap['tasks_per_second']:.1f} tasks/s ETA {eta}"]
+        if snap["by_type"]:
+            parts.append(" ".join(f"{t} {v['done']}/{v['total']}" for t, v in snap["by_type"].items()))
+        if snap["stage_ms"]:
+            parts.append(" ".join(f"{s} {ms:.1f}ms" for s, ms in snap["stage_ms"].items()))
+        if snap.get("queues"):
+            parts.append("queues " + " ".join(f"{s} {d}" for s, d in snap["queues"].items()))
+        line = " | ".join(parts)
+
+        if self.mode == "tty":
+            self.stream.write("\r\033[K" + line + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Emit the final report."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._queue is not None:
+            self._drain()
+        with self._lock:
+            self._emit(time.monotonic(), final=True)
+
+
+class WorkerProgress:
+    """
+    Progress handle used inside worker processes.
+
+    Register it as a stage hook on the worker's ``Metrics`` and call
+    ``advance(task_type)`` once per finished task; each task's stage timings
+    travel to the parent ``ProgressReporter`` in one small queue message.
+    Use ``flush()`` instead when the task is completed (and counted)
+    elsewhere, e.g. by a later pipeline stage in the parent.
+    """
+
+    def __init__(self, queue):
+        self._queue = queue
+        self._stage_sums: Dict[str, list] = {}
+
+    def stage(self, name: str) -> _StageClock:
+        return _StageClock(self, name)
+
+    def add_stage_time(self, name: str, seconds: float, count: int = 1) -> None:
+        entry = self._stage_sums.get(name)
+        if entry is None:
+            entry = self._stage_sums[name] = [0.0, 0]
+        entry[0] += seconds
+        entry[1] += count
+
+    def advance(self, task_type: Optional[str] = None) -> None:
+        """Count one finished task and send its stage timings."""
+        self._queue.put((task_type or "", self._stage_sums))
+        self._stage_sums = {}
+
+    def flush(self) -> None:
+        """Send pending stage timings without counting a task."""
+        if self._stage_sums:
+            self._queue.put((None, self._stage_sums))
+            self._stage_sums = {}
+
+    def __getstate__(self):
+        return {"_queue": self._queue}
+
+    def __setstate__(self, state):
+        self._queue = state["_queue"]
+        self._stage_sums = {}
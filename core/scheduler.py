@@ -0,0 +1,70 @@
+"""Cost-aware ordering and chunking of jobs for parallel runs."""
+
+from typing import Callable, Iterable, Iterator, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def lpt_order(items: Sequence[T], costs: Sequence[float]) -> List[T]:
+    """Longest-processing-time-first: items sorted by descending cost (stable)."""
+    order = sorted(range(len(items)), key=lambda i: -costs[i])
+    return [items[i] for i in order]
+
+
+def cost_chunks(
+    items: Sequence[T],
+    costs: Sequence[float],
+    target_cost: float,
+    max_chunk: int = 32,
+) -> List[List[T]]:
+    """
+    Group consecutive items into chunks of roughly ``target_cost``.
+
+    Expensive items travel alone; cheap ones are batched so per-dispatch
+    overhead (pickling, IPC round trips) is amortised. Chunks keep the
+    input order, so LPT-ordered input yields LPT-ordered chunks.
+    """
+    chunks: List[List[T]] = []
+    current: List[T] = []
+    current_cost = 0.0
+    for item, cost in zip(items, costs):
+        if current and (current_cost + cost > target_cost or len(current) >= max_chunk):
+            chunks.append(current)
+            current, current_cost = [], 0.0
+        current.append(item)
+        current_cost += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def schedule(
+    jobs: Iterable[T],
+    cost_fn: Callable[[T], float],
+    window: int = 512,
+    target_chunk_cost: float = 0.05,
+    max_chunk: int = 32,
+) -> Iterator[List[T]]:
+    """
+    Yield chunks of ``jobs`` in windowed LPT order.
+
+    Jobs are read ``window`` at a time (so unbounded streams stay bounded
+    in memory), sorted by descending estimated cost and chunked by
+    ``cost_chunks``. Fed to a pool that hands the next chunk to whichever
+    worker frees up first, this is greedy LPT list scheduling: the cheap
+    jobs of each window fill the gaps at its tail.
+    """
+    buffer: List[T] = []
+    for job in jobs:
+        buffer.append(job)
+        if len(buffer) >= window:
+            yield from _schedule_window(buffer, cost_fn, target_chunk_cost, max_chunk)
+            buffer = []
+    if buffer:
+        yield from _schedule_window(buffer, cost_fn, target_chunk_cost, max_chunk)
+
+
+def _schedule_window(buffer: List[T], cost_fn, target_chunk_cost: float, max_chunk: int) -> List[List[T]]:
+    costs = [cost_fn(job) for job in buffer]
+    ordered = lpt_order(list(zip(buffer, costs)), costs)
+    return cost_chunks([job for job, _ in ordered], [cost for _, cost in ordered], target_chunk_cost, max_chunk)
@@ -1,18 +1,135 @@
-"""Pydantic schemas for task data."""
-
-from typing import Optional, Any
-from pydantic import BaseModel
-
-
-class TaskPair(BaseModel):
-    """A task pair with initial and final states."""
-    task_id: str
-    domain: str
-    prompt: str
-    first_image: Any  # PIL Image
-    final_image: Optional[Any] = None  # PIL Image
-    ground_truth_video: Optional[str] = None  # Path to video (optional)
-    goal_text: Optional[str] = None  # Text answer (for tasks with goal.txt instead of final_frame.png)
-    
-    class Config:
-        arbitrary_types_allowed = True
+"""Task container passed from generation to output."""
+
+import io
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# An image artifact: a PIL Image, or the bytes of an encoded PNG
+ImagePayload = Union["Image.Image", bytes]
+
+
+def encode_png(image) -> bytes:
+    """Encode a PIL image as PNG bytes (identical to ``image.save(path)`` output)."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _decode(payload: Optional[ImagePayload]):
+    if not isinstance(payload, bytes):
+        return payload
+    from PIL import Image
+    image = Image.open(io.BytesIO(payload))
+    image.load()
+    return image
+
+
+class TaskPair:
+    """
+    A task pair with initial and final states.
+
+    Image artifacts (``first_image``, ``final_image``, ``instance_ids``) may
+    be given as PIL images or as already-encoded PNG bytes, and the video
+    (``ground_truth_video``) as a file path or encoded bytes. Reading an
+    image attribute decodes it on each access; ``payload()`` returns what
+    is stored, so ``OutputWriter`` writes encoded bytes as they are.
+    ``encode()`` converts everything in place, leaving a compact,
+    cheap-to-pickle pair.
+    """
+
+    __slots__ = (
+        "task_id", "domain", "prompt", "goal_text", "annotations", "artifact_keys", "cached_files",
+        "ground_truth_video", "video_ext", "metadata", "_first_image", "_final_image", "_instance_ids",
+    )
+
+    def __init__(
+        self,
+        task_id: str,
+        domain: str,
+        prompt: str,
+        first_image: Optional[ImagePayload] = None,
+        final_image: Optional[ImagePayload] = None,
+        ground_truth_video: Optional[Union[str, bytes]] = None,  # Path to video, or its bytes
+        goal_text: Optional[str] = None,  # Text answer (for tasks with goal.txt instead of final_frame.png)
+        instance_ids: Optional[ImagePayload] = None,  # "L" image: object ID per pixel, 0 = background
+        annotations: Optional[Dict[str, Any]] = None,  # Per-object boxes/areas (annotations.json)
+        artifact_keys: Optional[Dict[str, str]] = None,  # Artifact file name -> ArtifactCache key
+        video_ext: Optional[str] = None,  # Extension of video bytes (default: the path's, or .mp4)
+        metadata: Optional[Dict[str, Any]] = None,  # Catalog fields (see core.catalog.TaskCatalog.add)
+        cached_files: Optional[Dict[str, str]] = None,  # Artifact file name -> pinned cache file (ArtifactCache.pin)
+    ):
+        self.task_id = task_id
+        self.domain = domain
+        self.prompt = prompt
+        self._first_image = first_image
+        self._final_image = final_image
+        self.ground_truth_video = ground_truth_video
+        self.goal_text = goal_text
+        self._instance_ids = instance_ids
+        self.annotations = annotations
+        self.artifact_keys = artifact_keys
+        self.cached_files = cached_files
+        if video_ext is None:
+            is_path = isinstance(ground_truth_video, (str, Path))
+            video_ext = Path(ground_truth_video).suffix if is_path else ".mp4"
+        self.video_ext = video_ext
+        self.metadata = metadata
+
+    @property
+    def first_image(self):
+        return _decode(self._first_image)
+
+    @property
+    def final_image(self):
+        return _decode(self._final_image)
+
+    @property
+    def instance_ids(self):
+        return _decode(self._instance_ids)
+
+    def payload(self, name: str) -> Optional[ImagePayload]:
+        """The stored ``first_image``, ``final_image`` or ``instance_ids``, without decoding."""
+        return getattr(self, f"_{name}")
+
+    def encode(self, unlink_video: bool = False) -> "TaskPair":
+        """
+        Encode images to PNG bytes and read a video file into bytes, in place.
+
+        First and final frames are converted to RGB, as they are written.
+        With ``unlink_video`` the video file is deleted once read (a
+        temporary encoder output).
+        """
+        from .image_utils import ImageRenderer
+        for name in ("_first_image", "_final_image"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, bytes):
+                setattr(self, name, encode_png(ImageRenderer.ensure_rgb(value)))
+        if self._instance_ids is not None and not isinstance(self._instance_ids, bytes):
+            self._instance_ids = encode_png(self._instance_ids)
+        if isinstance(self.ground_truth_video, (str, Path)):
+            path = Path(self.ground_truth_video)
+            if path.exists():
+                self.ground_truth_video = path.read_bytes()
+                if unlink_video:
+                    path.unlink(missing_ok=True)
+            else:
+                self.ground_truth_video = None
+        return self
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        def describe(value):
+            if isinstance(value, bytes):
+                return f"<{len(value)} bytes>"
+            return "None" if value is None else type(value).__name__
+        images = ", ".join(
+            f"{name}={describe(self.payload(name))}" for name in ("first_image", "final_image", "instance_ids")
+        )
+        video = describe(self.ground_truth_video) if not isinstance(self.ground_truth_video, str) else repr(self.ground_truth_video)
+        return f"TaskPair(task_id={self.task_id!r}, domain={self.domain!r}, {images}, ground_truth_video={video})"
@@ -1,22 +1,44 @@
 """Video generation utilities - Generic framework code (DO NOT MODIFY)."""
 
+import threading
+from itertools import chain
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterable, Iterator, List, Sequence, Tuple, Optional
 from PIL import Image
 
-# Check if cv2 is available
+# Check if cv2 is available without importing it: cv2 and numpy are only
+# loaded when a VideoGenerator is actually created (see _load_backend).
 import importlib.util
 
 CV2_AVAILABLE = importlib.util.find_spec("cv2") is not None
 
-if CV2_AVAILABLE:
-    import cv2
-    import numpy as np
-else:
-    cv2 = None
-    np = None
-    print("⚠️  Warning: opencv-python not installed. Video generation disabled.")
-    print("   Install with: pip install opencv-python==4.8.1.78")
+cv2 = None
+np = None
+
+
+def _load_backend() -> None:
+    """Import cv2 and numpy on first use."""
+    global cv2, np
+    if cv2 is None:
+        import cv2 as _cv2
+        import numpy as _np
+        cv2, np = _cv2, _np
+
+
+# BGR conversion buffers, one per frame size and thread (encode threads
+# write videos concurrently); reused across frames and videos
+_buffers = threading.local()
+
+
+def _bgr_buffer(size: Tuple[int, int]) -> "np.ndarray":
+    """This thread's reusable BGR frame buffer for ``size`` (width, height)."""
+    pool = getattr(_buffers, "pool", None)
+    if pool is None:
+        pool = _buffers.pool = {}
+    buffer = pool.get(size)
+    if buffer is None:
+        buffer = pool[size] = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    return buffer
 
 
 class VideoGenerator:
@@ -46,7 +68,11 @@ class VideoGenerator:
             self.extension = '.avi'
         
         if not CV2_AVAILABLE:
-            raise ImportError("opencv-python is required for video generation")
+            raise ImportError(
+                "opencv-python is required for video generation "
+                "(install with: pip install opencv-python)"
+            )
+        _load_backend()
     
     @staticmethod
     def is_available() -> bool:
@@ -55,7 +81,7 @@ class VideoGenerator:
     
     def create_video_from_frames(
         self,
-        frames: List[Image.Image],
+        frames: Iterable[Image.Image],
         output_path: Path,
         size: Optional[Tuple[int, int]] = None
     ) -> Path:
@@ -63,20 +89,48 @@ class VideoGenerator:
         Create video from PIL Image frames.
         
         Args:
-            frames: List of PIL Images
+            frames: PIL Images (or RGB uint8 arrays); any iterable, consumed
+                one frame at a time. A frame repeated as the same object
+                (e.g. held for several frames) is converted only once.
             output_path: Path to save video (extension will be corrected)
             size: Optional (width, height) tuple. If None, uses first frame size
             
         Returns:
             Path to created video file
         """
-        if not frames:
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
             raise ValueError("No frames provided")
         
         # Get video size
         if size is None:
-            size = frames[0].size
+            size = (first.shape[1], first.shape[0]) if isinstance(first, np.ndarray) else first.size
         
+        return self._write_video(self._pooled_bgr(chain([first], frames), size), output_path, size)
+    
+    def _pooled_bgr(self, frames: Iterable, size: Tuple[int, int]) -> Iterator["np.ndarray"]:
+        """
+        Yield each frame as BGR in this thread's buffer for ``size``.
+        
+        The buffer is overwritten by the next distinct frame, so consume
+        (encode) each yielded frame first.
+        """
+        buffer = _bgr_buffer(size)
+        previous = None
+        for frame in frames:
+            if frame is not previous:
+                self._to_bgr(frame, size, out=buffer)
+                previous = frame
+            yield buffer
+    
+    def _write_video(
+        self,
+        frames_bgr: Iterable["np.ndarray"],
+        output_path: Path,
+        size: Tuple[int, int]
+    ) -> Path:
+        """Stream BGR uint8 frames of ``size`` into a new video file."""
         width, height = size
         
         # Ensure correct extension
@@ -94,22 +148,37 @@ class VideoGenerator:
             (width, height)
         )
         
-        # Write frames
-        for frame in frames:
-            # Ensure RGB and correct size
-            if frame.size != size:
-                frame = frame.resize(size, Image.Resampling.LANCZOS)
-            
-            # Convert PIL Image to OpenCV format (BGR)
-            frame_rgb = frame.convert('RGB')
-            frame_array = np.array(frame_rgb)
-            frame_bgr = cv2.cvtColor(frame_array, cv2.COLOR_RGB2BGR)
-            
-            writer.write(frame_bgr)
-        
-        writer.release()
+        try:
+            for frame_bgr in frames_bgr:
+                writer.write(frame_bgr)
+        finally:
+            writer.release()
         return output_path
     
+    @staticmethod
+    def _to_bgr(frame, size: Tuple[int, int], out: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """
+        Convert a PIL Image or RGB array to a BGR array of ``size``.
+        
+        Written into ``out`` (a uint8 array of that shape) if given,
+        otherwise into a new array.
+        """
+        if isinstance(frame, np.ndarray):
+            # RGB array (e.g. a shared-memory view): converted without a PIL copy
+            if (frame.shape[1], frame.shape[0]) == size:
+                return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=out)
+            frame = Image.fromarray(frame)
+        
+        # Ensure RGB and correct size
+        if frame.size != size:
+            frame = frame.resize(size, Image.Resampling.LANCZOS)
+        if frame.mode != 'RGB':
+            frame = frame.convert('RGB')
+        
+        # Convert PIL Image to OpenCV format (BGR); asarray is the one copy
+        # out of PIL's pixel storage, the conversion goes straight into ``out``
+        return cv2.cvtColor(np.asarray(frame), cv2.COLOR_RGB2BGR, dst=out)
+    
     def create_crossfade_video(
         self,
         start_image: Image.Image,
@@ -134,30 +203,16 @@ class VideoGenerator:
         if not CV2_AVAILABLE:
             return None
         
-        frames = []
-        
-        # Hold initial position
-        for _ in range(hold_frames):
-            frames.append(start_image.copy())
-        
-        # Smooth cross-fade transition
-        start_rgba = start_image.convert('RGBA')
-        end_rgba = end_image.convert('RGBA')
-        
-        # Ensure same size
-        if start_rgba.size != end_rgba.size:
-            end_rgba = end_rgba.resize(start_rgba.size, Image.Resampling.LANCZOS)
-        
-        for i in range(transition_frames):
-            alpha = i / (transition_frames - 1) if transition_frames > 1 else 1.0
-            blended = Image.blend(start_rgba, end_rgba, alpha)
-            frames.append(blended.convert('RGB'))
-        
-        # Hold final position
-        for _ in range(hold_frames):
-            frames.append(end_image.copy())
+        size = start_image.size
+        start, end, start_hold, end_hold = self._transition_endpoints(start_image, end_image)
+        alphas = _alpha_ramp(transition_frames)
         
-        return self.create_video_from_frames(frames, output_path)
+        frames = chain(
+            [start_hold] * hold_frames,
+            _blend_ramp(start, end, alphas),
+            [end_hold] * hold_frames
+        )
+        return self._write_video(frames, output_path, size)
     
     def create_sliding_fade_video(
         self,
@@ -187,47 +242,42 @@ class VideoGenerator:
         if not CV2_AVAILABLE:
             return None
         
-        frames = []
-        
-        # Hold initial position
-        for _ in range(hold_frames):
-            frames.append(start_image.copy())
-        
-        # Sliding transition with fade out/fade in
-        start_rgba = start_image.convert('RGBA')
+        size = start_image.size
+        start, end, start_hold, end_hold = self._transition_endpoints(start_image, end_image)
+        progress = _alpha_ramp(transition_frames)
+        
+        # Fade curve: fade out in first half, fade in in second half
+        # (opacity 1.0 -> 0.2 -> 1.0), a dip in opacity in the middle
+        opacity = np.where(
+            progress < 0.5,
+            1.0 - (progress * 2) * 0.8,
+            0.2 + ((progress - 0.5) * 2) * 0.8
+        ).astype(np.float32)
+        
+        # Fading towards transparent black scales each value; on uint8
+        # values that is a 256-entry lookup table per frame
+        levels = np.arange(256, dtype=np.float32)
+        fades = [(levels * op).astype(np.uint8) for op in opacity]
+        
+        frames = chain(
+            [start_hold] * hold_frames,
+            _blend_ramp(start, end, progress, fades),
+            [end_hold] * hold_frames
+        )
+        return self._write_video(frames, output_path, size)
+    
+    def _transition_endpoints(self, start_image: Image.Image, end_image: Image.Image) -> tuple:
+        """
+        BGR arrays for a transition: blend endpoints (colour channels of the
+        RGBA conversions, end resized to the start size) and the hold frames.
+        """
+        size = start_image.size
         end_rgba = end_image.convert('RGBA')
-        
-        # Ensure same size
-        if start_rgba.size != end_rgba.size:
-            end_rgba = end_rgba.resize(start_rgba.size, Image.Resampling.LANCZOS)
-        
-        for i in range(transition_frames):
-            # Progress through transition (0 to 1)
-            progress = i / (transition_frames - 1) if transition_frames > 1 else 1.0
-            
-            # Fade curve: fade out in first half, fade in in second half
-            # Creates a dip in opacity in the middle
-            if progress < 0.5:
-                # Fading out: opacity goes from 1.0 to 0.2
-                opacity = 1.0 - (progress * 2) * 0.8
-            else:
-                # Fading in: opacity goes from 0.2 to 1.0
-                opacity = 0.2 + ((progress - 0.5) * 2) * 0.8
-            
-            # Blend the positions (sliding motion)
-            blended = Image.blend(start_rgba, end_rgba, progress)
-            
-            # Apply opacity effect by blending with semi-transparent version
-            transparent = Image.new('RGBA', blended.size, (0, 0, 0, 0))
-            faded = Image.blend(transparent, blended, opacity)
-            
-            frames.append(faded.convert('RGB'))
-        
-        # Hold final position
-        for _ in range(hold_frames):
-            frames.append(end_image.copy())
-        
-        return self.create_video_from_frames(frames, output_path)
+        if end_rgba.size != size:
+            end_rgba = end_rgba.resize(size, Image.Resampling.LANCZOS)
+        start = np.asarray(start_image.convert('RGBA'))[..., 2::-1]
+        end = np.asarray(end_rgba)[..., 2::-1]
+        return start, end, self._to_bgr(start_image, size), self._to_bgr(end_image, size)
     
     def interpolate_frames(
         self,
@@ -246,20 +296,71 @@ class VideoGenerator:
         Returns:
             List of frames including start, intermediates, and end
         """
-        frames = [start_frame]
-        
         # Ensure same size and mode
         if start_frame.size != end_frame.size:
             end_frame = end_frame.resize(start_frame.size, Image.Resampling.LANCZOS)
         
-        start_frame = start_frame.convert('RGBA')
-        end_frame = end_frame.convert('RGBA')
+        start = np.asarray(start_frame.convert('RGBA'))[..., :3]
+        end_rgb = end_frame.convert('RGBA').convert('RGB')
         
         # Generate intermediate frames
-        for i in range(1, num_intermediate + 1):
-            alpha = i / (num_intermediate + 1)
-            blended = Image.blend(start_frame, end_frame, alpha)
-            frames.append(blended.convert('RGB'))
-        
-        frames.append(end_frame.convert('RGB'))
+        alphas = np.arange(1, num_intermediate + 1, dtype=np.float64) / (num_intermediate + 1)
+        frames = [start_frame]
+        frames.extend(Image.fromarray(blended) for blended in _blend_ramp(start, np.asarray(end_rgb), alphas))
+        frames.append(end_rgb)
         return frames
+
+
+def _alpha_ramp(steps: int) -> "np.ndarray":
+    """Blend weights 0..1 over ``steps`` frames (a single frame is 1.0)."""
+    if steps <= 1:
+        return np.ones(max(steps, 0))
+    return np.arange(steps, dtype=np.float64) / (steps - 1)
+
+
+def _blend_ramp(
+    start: "np.ndarray",
+    end: "np.ndarray",
+    alphas: Sequence[float],
+    luts: Optional[Sequence["np.ndarray"]] = None
+) -> Iterator["np.ndarray"]:
+    """
+    Yield ``start + alpha * (end - start)`` as uint8 for each alpha.
+
+    Matches ``Image.blend`` bit for bit: single precision arithmetic and
+    truncation towards zero. If ``luts`` is given, frame ``i`` is also
+    mapped through the 256-entry table ``luts[i]``. The yielded array is
+    reused for the next frame, so consume (encode or copy) it first.
+
+    Rendered scenes use few colours, so when at most 256 distinct
+    (start, end) value pairs occur the pairs are indexed once and each
+    frame is a single ``cv2.LUT`` over that index; otherwise each frame is
+    computed on float32 buffers.
+    """
+    alphas = np.asarray(alphas, dtype=np.float32)
+    start = np.ascontiguousarray(start)
+    end = np.ascontiguousarray(end)
+    out = np.empty_like(start)
+    codes = np.left_shift(start, 8, dtype=np.uint16) | end
+    pairs = np.flatnonzero(np.bincount(codes.ravel(), minlength=1 << 16))
+    
+    if len(pairs) <= 256:
+        remap = np.zeros(1 << 16, dtype=np.uint8)
+        remap[pairs] = np.arange(len(pairs), dtype=np.uint8)
+        index = remap[codes]
+        base = (pairs >> 8).astype(np.float32)
+        delta = (pairs & 0xFF).astype(np.float32) - base
+        table = np.zeros(256, dtype=np.uint8)
+        for i, alpha in enumerate(alphas):
+            table[:len(pairs)] = (alpha * delta + base).astype(np.uint8)
+            yield cv2.LUT(index, table if luts is None else luts[i][table], dst=out)
+        return
+    
+    base = start.astype(np.float32)
+    delta = end.astype(np.float32) - base
+    scratch = np.empty_like(base)
+    for i, alpha in enumerate(alphas):
+        np.multiply(delta, alpha, out=scratch)
+        scratch += base
+        np.copyto(out, scratch, casting="unsafe")  # truncates, like astype
+        yield out if luts is None else cv2.LUT(out, luts[i], dst=out)
@@ -29,6 +29,11 @@ setup(
     packages=find_packages(include=["core", "core.*", "src", "src.*"]),
     python_requires=">=3.8",
     install_requires=requirements,
+    entry_points={
+        "console_scripts": [
+            "counting-objects-generate=src.cli:main",
+        ],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -5,10 +5,30 @@ Files to customize:
     - config.py   : Task-specific configuration (TaskConfig)
     - generator.py: Task generation logic (TaskGenerator)
     - prompts.py  : Task prompts/instructions (get_prompt)
+
+Exports are resolved lazily so that importing a submodule such as
+``src.cli`` does not pull in pydantic, PIL or the video backends.
 """
 
-from .config import TaskConfig
-from .generator import TaskGenerator
-from .prompts import get_prompt
+import importlib
+
+_EXPORTS = {
+    "TaskConfig": ".config",
+    "TaskGenerator": ".generator",
+    "get_prompt": ".prompts",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["TaskConfig", "TaskGenerator", "get_prompt"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
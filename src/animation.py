@@ -0,0 +1,98 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          COUNTING ANIMATION PLANS                             ║
+║                                                                               ║
+║  Which objects each step of the ground truth video highlights, and for        ║
+║  how many frames.                                                             ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+The video holds the scene, highlights the objects step by step and holds
+the final count. ``config.animation_mode`` picks the steps:
+
+    sequential   one object per step, in placement order (the default)
+    grouped      ``config.highlight_group_size`` objects per step
+    rows         one step per horizontal band of the image, top to bottom;
+                 a band is as tall as the largest object, so the number of
+                 steps depends on the image height, not the object count
+
+Each step is a single drawn frame shown for ``highlight_frames`` video
+frames, so drawing cost grows with the number of steps and encoding cost
+and file size with the number of frames. ``config.max_video_frames``
+caps the total: hold and highlight durations shrink first (down to one
+frame each), then consecutive steps are merged until the plan fits.
+"""
+
+from typing import List, NamedTuple
+
+from .config import TaskConfig
+
+ANIMATION_MODES = ("sequential", "grouped", "rows")
+
+# Nominal frame counts (see TaskGenerator._create_counting_animation_frames)
+HOLD_FRAMES = 10
+HIGHLIGHT_FRAMES = 5
+
+
+class AnimationPlan(NamedTuple):
+    """The highlight steps of one task's video and their timing."""
+    steps: List[List[int]]   # Object indices highlighted together, in order
+    hold_frames: int         # Frames of the opening scene and the final count
+    highlight_frames: int    # Frames per step
+
+    @property
+    def frame_count(self) -> int:
+        return 2 * self.hold_frames + len(self.steps) * self.highlight_frames
+
+
+def highlight_steps(task_data: dict, config: TaskConfig) -> List[List[int]]:
+    """Object indices highlighted by each step under ``config.animation_mode``."""
+    count = task_data["num_objects"]
+    if config.animation_mode == "grouped":
+        size = max(1, config.highlight_group_size)
+        return [list(range(start, min(count, start + size))) for start in range(0, count, size)]
+    if config.animation_mode == "rows":
+        if not count:
+            return []
+        band = max(1, max(task_data["sizes"]))
+        rows = {}
+        for i, (x, y) in enumerate(task_data["positions"]):
+            rows.setdefault(y // band, []).append((x, i))
+        return [[i for _, i in sorted(rows[row])] for row in sorted(rows)]
+    return [[i] for i in range(count)]
+
+
+def max_steps(num_objects: int, config: TaskConfig) -> int:
+    """Upper bound on the number of steps for ``num_objects`` (positions unknown)."""
+    steps = num_objects
+    if config.animation_mode == "grouped":
+        steps = -(-num_objects // max(1, config.highlight_group_size))
+    if config.max_video_frames:
+        steps = min(steps, max(1, config.max_video_frames - 2))
+    return steps
+
+
+def plan_animation(
+    task_data: dict,
+    config: TaskConfig,
+    hold_frames: int = HOLD_FRAMES,
+    highlight_frames: int = HIGHLIGHT_FRAMES,
+) -> AnimationPlan:
+    """Steps and timing of one task's video, fitted to ``config.max_video_frames``."""
+    plan = AnimationPlan(highlight_steps(task_data, config), hold_frames, highlight_frames)
+    cap = config.max_video_frames
+    if not cap or plan.frame_count <= cap:
+        return plan
+
+    steps = plan.steps
+    limit = max(1, cap - 2)  # one frame per step plus one per hold
+    if len(steps) > limit:
+        # Merge consecutive steps into ``limit`` nearly equal runs
+        steps = [
+            [i for step in steps[k * len(steps) // limit:(k + 1) * len(steps) // limit] for i in step]
+            for k in range(limit)
+        ]
+
+    scale = cap / (2 * hold_frames + len(steps) * highlight_frames)
+    highlight = max(1, int(highlight_frames * scale))
+    hold = max(1, min(int(hold_frames * scale), (cap - len(steps) * highlight) // 2))
+    return AnimationPlan(steps, hold, highlight)
@@ -0,0 +1,693 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                           COMMAND LINE ENTRY POINT                            ║
+║                                                                               ║
+║  Installed as the `counting-objects-generate` console script.                 ║
+║  Heavy modules (pydantic, PIL, cv2) are imported only once arguments have     ║
+║  been parsed, and cv2 is never imported when videos are disabled.             ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Usage:
+    counting-objects-generate --num-samples 100
+    counting-objects-generate --num-samples 100 --output data/my_task --seed 42
+    counting-objects-generate --by-task-type --tasks-per-type 20
+    counting-objects-generate --sweep sweep.json --total-tasks 100 --workers 8
+"""
+
+import argparse
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core import OutputWriter
+    from core.memory import MemoryGovernor
+    from core.profiling import StageProfiler
+    from core.progress import ProgressReporter
+    from .config import TaskConfig
+    from .generator import TaskGenerator
+    from .plan import PlanSource, TaskPlan
+    from .verifier import RenderVerifier, VerificationReport
+
+Target = Tuple["TaskGenerator", "OutputWriter"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the generation CLI."""
+    parser = argparse.ArgumentParser(
+        prog="counting-objects-generate",
+        description="Generate task dataset",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    counting-objects-generate --num-samples 10
+    counting-objects-generate --num-samples 100 --output data/output --seed 42
+    counting-objects-generate --by-task-type --tasks-per-type 20
+    counting-objects-generate --total-tasks 20  # Generate 20 tasks total, distributed across all types
+        """
+    )
+    parser.add_argument(
+        "--num-samples",
+        type=int,
+        default=None,
+        help="Number of task samples to generate (legacy mode)"
+    )
+    parser.add_argument(
+        "--by-task-type",
+        action="store_true",
+        help="Generate tasks by task type"
+    )
+    parser.add_argument(
+        "--tasks-per-type",
+        type=int,
+        default=None,
+        help="Number of tasks to generate per task type"
+    )
+    parser.add_argument(
+        "--total-tasks",
+        type=int,
+        default=None,
+        help="Total number of tasks to generate, distributed across all task types"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="data/questions",
+        help="Output directory (default: data/questions)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducibility"
+    )
+    parser.add_argument(
+        "--no-videos",
+        action="store_true",
+        help="Disable video generation"
+    )
+    parser.add_argument(
+        "--animation",
+        choices=["sequential", "grouped", "rows"],
+        default="sequential",
+        help="Counting video steps: one object at a time, --highlight-group-size objects, "
+             "or one image row at a time (default: sequential)"
+    )
+    parser.add_argument(
+        "--highlight-group-size",
+        type=int,
+        default=5,
+        metavar="K",
+        help="Objects highlighted per step with --animation grouped (default: 5)"
+    )
+    parser.add_argument(
+        "--max-video-frames",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Cap ground truth videos at N frames (>= 3): shorter timing first, then merged steps"
+    )
+    parser.add_argument(
+        "--video-size",
+        type=str,
+        default=None,
+        metavar="WxH",
+        help="Ground truth video size (e.g. 256 or 320x240); frames are drawn at this size "
+             "instead of resized from the image size"
+    )
+    parser.add_argument(
+        "--near-duplicate-distance",
+        type=int,
+        default=0,
+        metavar="PX",
+        help="Also reject tasks whose objects all lie within PX pixels (position and size) "
+             "of an already generated task's (default: 0, exact duplicates only)"
+    )
+    parser.add_argument(
+        "--annotations",
+        action="store_true",
+        help="Also write instance_ids.png (object ID per pixel) and annotations.json (bounding boxes) per task"
+    )
+    parser.add_argument(
+        "--resolutions",
+        type=str,
+        default=None,
+        metavar="SIZES",
+        help="Render every task at several sizes (e.g. 256,512,1024 or 640x480) into OUTPUT/<W>x<H>/; "
+             "tasks are sampled once at the default 512x512"
+    )
+    parser.add_argument(
+        "--sweep",
+        type=str,
+        default=None,
+        metavar="SPEC",
+        help="JSON/YAML list of TaskConfig overrides: generate every variant into OUTPUT/<name>/ "
+             "in one process and worker pool (see src/sweep.py)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Content-addressed artifact cache: unchanged PNGs/MP4s are hardlinked from DIR instead of regenerated"
+    )
+    parser.add_argument(
+        "--catalog",
+        action="store_true",
+        help="Record every task (type, count, shape/color histograms, signature, file sizes and "
+             "SHA-256) in OUTPUT/catalog.sqlite for subset queries"
+    )
+    parser.add_argument(
+        "--layout",
+        type=str,
+        default=None,
+        metavar="LAYOUT",
+        help="Task directory layout: flat ({domain}_task/<id>/), or hashed fan-out "
+             "({domain}_task/ab/cd/<id>/; hashed:LEVELS[xWIDTH] to tune) recorded in layout.json "
+             "(default: the existing output's layout, else flat)"
+    )
+    parser.add_argument(
+        "--fsync-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Make tasks durable in groups of N: fsync their files, then rename them into place "
+             "(default: 0, atomic rename without fsync)"
+    )
+    parser.add_argument(
+        "--verify",
+        choices=["off", "flag", "regenerate"],
+        default="off",
+        help="Count visible objects in each first image: log mismatches, or also re-place them (default: off)"
+    )
+    parser.add_argument(
+        "--verify-report",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="JSON lines log of verification mismatches (default: OUTPUT/verification.jsonl)"
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        default=None,
+        help="Write a JSON summary of stage timings, retries and bytes written"
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        type=str,
+        default=None,
+        help="Write metrics as a Prometheus textfile (node_exporter textfile collector)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Profile generation per stage; writes {stage}.pstats, stacks.collapsed and summary.txt to DIR"
+    )
+    parser.add_argument(
+        "--profile-first",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Only profile the first N tasks (with --profile)"
+    )
+    parser.add_argument(
+        "--profile-fraction",
+        type=float,
+        default=None,
+        metavar="F",
+        help="Profile a random fraction F of tasks (with --profile)"
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=1.0,
+        metavar="MS",
+        help="Stack sampling interval in milliseconds (default: 1.0)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Render in N worker processes through the staged pipeline (default: 0, sequential)"
+    )
+    parser.add_argument(
+        "--encode-workers",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Video encoding threads in pipeline mode (default: 2)"
+    )
+    parser.add_argument(
+        "--write-workers",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Output writing threads in pipeline mode (default: 2)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=16,
+        metavar="N",
+        help="Bound of the encode and write queues in pipeline mode (default: 16)"
+    )
+    parser.add_argument(
+        "--schedule",
+        choices=["plan", "lpt"],
+        default="lpt",
+        help="Render order in pipeline mode: plan order, or longest-estimated-first chunks (default: lpt)"
+    )
+    parser.add_argument(
+        "--schedule-window",
+        type=int,
+        default=512,
+        metavar="N",
+        help="Tasks reordered together by the lpt schedule (default: 512)"
+    )
+    parser.add_argument(
+        "--cost-model",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Calibrated cost model JSON (from python -m src.cost_model) for the lpt schedule"
+    )
+    parser.add_argument(
+        "--shm-mb",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="Shared-memory frame ring for render results in pipeline mode; 0 pickles them (default: 256)"
+    )
+    parser.add_argument(
+        "--estimate",
+        type=int,
+        nargs="?",
+        const=50,
+        default=None,
+        metavar="N",
+        help="Dry run: generate a sample of about N tasks (default: 50) in a temporary directory and project "
+             "wall time per worker count, disk usage per artifact type and inodes for the full run "
+             "(written as JSON to --metrics-json if given)"
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=str,
+        default=None,
+        metavar="SIZE",
+        help="Memory budget for the whole run, e.g. 4G: pipeline concurrency backs off near it; "
+             "peak memory per stage is reported at the end"
+    )
+    parser.add_argument(
+        "--progress",
+        choices=["auto", "tty", "log", "jsonl", "quiet"],
+        default="auto",
+        help="Progress output on stderr: live TTY line, log lines, JSON lines, or none (default: auto)"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        metavar="SEC",
+        help="Seconds between progress updates (default: 2.0)"
+    )
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="Suppress all non-error output (same as --progress quiet)"
+    )
+    return parser
+
+
+def _run_estimate(args: argparse.Namespace, config: "TaskConfig", plan: "TaskPlan", layout) -> None:
+    """``--estimate``: generate a sample of the plan and print the projection."""
+    import os
+    from .estimate import estimate_run
+    variants = [config]
+    if args.resolutions:
+        from .multires import parse_resolutions, resolution_config
+        variants = [resolution_config(config, size) for size in parse_resolutions(args.resolutions)]
+    estimate = estimate_run(
+        config, plan, sample_size=args.estimate, targets=variants,
+        verify_mode=args.verify if args.verify != "off" else None, layout=layout,
+    )
+    worker_counts = sorted({0, args.workers, *(2 ** i for i in range(8) if 2 ** i <= (os.cpu_count() or 1))})
+    print(estimate.report(worker_counts, encode_workers=args.encode_workers, write_workers=args.write_workers))
+    if args.metrics_json:
+        import json
+        Path(args.metrics_json).write_text(json.dumps(estimate.to_dict(
+            worker_counts, encode_workers=args.encode_workers, write_workers=args.write_workers
+        ), indent=2))
+
+
+def _run_parallel(
+    args: argparse.Namespace,
+    generator: "TaskGenerator",
+    plan: "TaskPlan",
+    writer: "OutputWriter",
+    progress: "ProgressReporter",
+    targets: List[Target],
+    sources: List["PlanSource"],
+    report: Optional["VerificationReport"],
+    governor: Optional["MemoryGovernor"],
+    say: Callable[..., None],
+) -> None:
+    """``--workers N``: run the staged render/encode/write pipeline."""
+    from .cost_model import CostModel
+    from .parallel import run_parallel
+    pipeline = run_parallel(
+        generator, plan, writer, progress,
+        render_workers=args.workers,
+        encode_workers=args.encode_workers,
+        write_workers=args.write_workers,
+        queue_size=args.queue_size,
+        schedule=args.schedule,
+        schedule_window=args.schedule_window,
+        cost_model=CostModel.load(args.cost_model) if args.cost_model else None,
+        shm_mb=args.shm_mb,
+        targets=targets,
+        verify_mode=args.verify if args.verify != "off" else None,
+        verify_report=report,
+        governor=governor,
+        sources=sources,
+    )
+    progress.close()
+    stats = pipeline.queue_stats()
+    say("📊 Queue depth (mean/max/capacity): " + ", ".join(
+        f"{stage} {s['mean']:.1f}/{s['max']}/{s['capacity']}" for stage, s in stats.items()
+    ))
+
+
+def _run_sequential(
+    targets: List[Target],
+    sources: List["PlanSource"],
+    progress: "ProgressReporter",
+    verifiers: Dict[int, "RenderVerifier"],
+    regenerators: Dict[int, "RenderVerifier"],
+    report: Optional["VerificationReport"],
+    profiler: Optional["StageProfiler"],
+    governor: Optional["MemoryGovernor"],
+) -> None:
+    """Generate and write tasks one at a time, in plan order, so memory stays flat."""
+    from .multires import scale_task_data
+
+    def render(target: "TaskGenerator", task_id: str, task_data: dict):
+        if not verifiers:
+            return target.render_task(task_id, task_data)
+        rendered, record = verifiers[id(target)].render(target, task_id, task_data)
+        report.add(record)
+        return rendered
+
+    offset = 0  # profiler task indices run on across sources
+    for source in sources:
+        sampler = source.sampler
+        sampler.reseed()  # each source samples as it would in a run of its own
+        for planned in source.plan:
+            with profiler.task(offset + planned.index) if profiler else nullcontext():
+                if source.targets == [0] and targets[0][0] is sampler and not (verifiers or regenerators):
+                    targets[0][1].write_task_pair(sampler.generate_planned_task(planned))
+                else:
+                    task_data = sampler.sample_task_data(task_type=planned.task_type, unique=planned.unique)
+                    if regenerators:
+                        task_data, record = regenerators[id(sampler)].regenerate(
+                            sampler, planned.task_id, task_data, unique=planned.unique
+                        )
+                        report.add(record)
+                    for index in source.targets:
+                        target, target_writer = targets[index]
+                        scaled = scale_task_data(task_data, sampler.config.image_size, target.config.image_size)
+                        target_writer.write_task_pair(target.encode_task(render(target, planned.task_id, scaled)))
+            progress.advance(task_type=source.label or planned.task_type or "random")
+            if governor is not None:
+                governor.update(force=True)  # sequential runs have no concurrency to adapt; just track the peak
+        offset += len(source.plan)
+    progress.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.total_tasks is None and not args.by_task_type and args.num_samples is None and not args.sweep:
+        parser.error("Either --num-samples, --by-task-type, or --total-tasks must be specified")
+    if args.sweep and (args.resolutions or args.estimate is not None):
+        parser.error("--sweep cannot be combined with --resolutions or --estimate")
+    if args.max_memory:
+        from core.memory import parse_size
+        try:
+            args.max_memory = parse_size(args.max_memory)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.verify == "regenerate" and args.resolutions:
+        parser.error("--verify regenerate cannot be combined with --resolutions (resolutions would diverge)")
+
+    # Deferred imports: keep `--help` and argument errors fast
+    from core import OutputWriter
+    from core.metrics import Metrics
+    from core.progress import ProgressReporter
+    from core.video_utils import VideoGenerator
+    from .config import TaskConfig
+    from .generator import TaskGenerator
+    from .plan import PlanSource, TaskPlan
+
+    # ──────────────────────────────────────────────────────────────────────────
+    #  Configure your task here
+    #  Add any additional TaskConfig parameters as needed
+    # ──────────────────────────────────────────────────────────────────────────
+
+    if args.quiet:
+        args.progress = "quiet"
+    say = print if args.progress != "quiet" else (lambda *a, **k: None)
+
+    generate_videos = not args.no_videos
+
+    # Check video generation availability (does not import cv2)
+    if generate_videos:
+        if VideoGenerator.is_available():
+            say("✅ Video generation enabled (ground_truth.mp4 will be generated)")
+        else:
+            print("⚠️  Warning: opencv-python not installed. Video generation will be disabled.")
+            print("   Install with: pip install opencv-python")
+            print("   Continuing without video generation...")
+            generate_videos = False
+
+    layout = None
+    if args.layout:
+        from core.layout import TaskLayout
+        try:
+            layout = TaskLayout.parse(args.layout)
+        except ValueError as exc:
+            parser.error(f"--layout: {exc}")
+    if args.near_duplicate_distance < 0:
+        parser.error("--near-duplicate-distance must be 0 or more")
+    if args.fsync_every < 0:
+        parser.error("--fsync-every must be 0 or more")
+    if args.highlight_group_size < 1:
+        parser.error("--highlight-group-size must be at least 1")
+    if args.max_video_frames is not None and args.max_video_frames < 3:
+        parser.error("--max-video-frames must be at least 3")
+    video_size = None
+    if args.video_size:
+        from .multires import parse_resolutions
+        try:
+            sizes = parse_resolutions(args.video_size)
+        except ValueError:
+            sizes = []
+        if len(sizes) != 1 or min(sizes[0]) < 1:
+            parser.error("--video-size must be one size, e.g. 256 or 320x240")
+        video_size = sizes[0]
+    animation = {
+        "animation_mode": args.animation,
+        "highlight_group_size": args.highlight_group_size,
+        "max_video_frames": args.max_video_frames,
+        "video_size": video_size,
+    }
+
+    config = TaskConfig(
+        num_samples=args.num_samples or 0,  # Not used when by-task-type
+        random_seed=args.seed,
+        output_dir=Path(args.output),
+        generate_videos=generate_videos,
+        generate_annotations=args.annotations,
+        near_duplicate_distance=args.near_duplicate_distance,
+        **animation,
+    )
+
+    # Metrics are near-free when disabled; enable them only if exported
+    metrics = Metrics(enabled=bool(args.metrics_json or args.metrics_prom))
+
+    profiler = None
+    if args.profile:
+        from core.profiling import StageProfiler
+        profiler = StageProfiler(
+            Path(args.profile),
+            first_n=args.profile_first,
+            fraction=args.profile_fraction,
+            interval=args.profile_interval / 1000,
+        )
+        metrics.add_stage_hook(profiler)
+
+    def make_plan(config: TaskConfig) -> TaskPlan:
+        if args.total_tasks:
+            return TaskPlan.total(config, args.total_tasks)
+        if args.by_task_type:
+            return TaskPlan.per_type(config, args.tasks_per_type or 20)
+        if args.num_samples is not None:
+            return TaskPlan.legacy(config, args.num_samples)
+        raise ValueError("no task count: set total_tasks, tasks_per_type or num_samples in the sweep spec "
+                         "or on the command line")
+
+    variants = None
+    if args.sweep:
+        from .sweep import load_variants
+        try:
+            variants = load_variants(Path(args.sweep), {
+                "random_seed": args.seed,
+                "generate_videos": generate_videos,
+                "generate_annotations": args.annotations,
+                "near_duplicate_distance": args.near_duplicate_distance,
+                **animation,
+            }, Path(args.output), make_plan)
+        except (OSError, ValueError, ImportError) as exc:
+            parser.error(f"--sweep: {exc}")
+        plan = variants[0].plan
+        say(f"🧪 Sweeping {len(variants)} variants: " + ", ".join(
+            f"{variant.name} ({len(variant.plan)})" for variant in variants
+        ))
+    elif args.total_tasks:
+        plan = make_plan(config)
+        per_type, remainder = divmod(args.total_tasks, len(config.object_types) + 1)
+        say(f"🎲 Generating {args.total_tasks} total tasks ({per_type} per type, with {remainder} extra)...")
+    elif args.by_task_type:
+        plan = make_plan(config)
+        say(f"🎲 Generating {args.tasks_per_type or 20} unique tasks for each task type...")
+    else:
+        plan = make_plan(config)
+        say(f"🎲 Generating {args.num_samples} tasks...")
+
+    if args.estimate is not None:
+        _run_estimate(args, config, plan, layout)
+        return
+
+    governor = None
+    if args.max_memory:
+        from core.memory import MemoryGovernor, StageMemory
+        stage_memory = StageMemory()
+        metrics.add_stage_hook(stage_memory)
+        governor = MemoryGovernor(args.max_memory, metrics=metrics, stages=stage_memory)
+
+    cache = None
+    if args.cache_dir:
+        from core.artifact_cache import ArtifactCache
+        cache = ArtifactCache(Path(args.cache_dir))
+
+    def make_writer(output_dir: Path) -> OutputWriter:
+        catalog = None
+        if args.catalog:
+            from core.catalog import TaskCatalog
+            catalog = TaskCatalog(Path(output_dir) / "catalog.sqlite")
+        return OutputWriter(
+            output_dir, metrics=metrics, cache=cache, catalog=catalog,
+            fsync_every=args.fsync_every, layout=layout,
+        )
+
+    generator = TaskGenerator(config, metrics=metrics, artifact_cache=cache)
+    if variants:
+        targets = [
+            (TaskGenerator(variant.config, metrics=metrics, artifact_cache=cache),
+             make_writer(variant.config.output_dir))
+            for variant in variants
+        ]
+        generator, writer = targets[0]
+        sources = [
+            PlanSource(target, variant.plan, [i], variant.name)
+            for i, (variant, (target, _)) in enumerate(zip(variants, targets))
+        ]
+    else:
+        if args.resolutions:
+            from .multires import parse_resolutions, resolution_config
+            targets = []
+            for size in parse_resolutions(args.resolutions):
+                variant = resolution_config(config, size)
+                targets.append((
+                    TaskGenerator(variant, metrics=metrics, artifact_cache=cache),
+                    make_writer(variant.output_dir),
+                ))
+            say("🖼️  Rendering at " + ", ".join(f"{w}x{h}" for w, h in parse_resolutions(args.resolutions)))
+        else:
+            targets = [(generator, make_writer(Path(args.output)))]
+        writer = targets[0][1]
+        sources = [PlanSource(generator, plan, list(range(len(targets))))]
+    for target, target_writer in targets:
+        try:
+            target_writer.prepare(target.config.domain)
+        except ValueError as exc:
+            parser.error(f"--layout: {exc}")
+    total_tasks = sum(len(source.plan) for source in sources)
+    # Flag mode verifies each render; regenerate mode verifies (and
+    # re-places) at sampling time, where uniqueness is checked
+    verifiers, regenerators, report = {}, {}, None
+    if args.verify != "off":
+        from .verifier import RenderVerifier, VerificationReport
+        if args.verify == "flag":
+            verifiers = {id(target): RenderVerifier(target.config, "flag") for target, _ in targets}
+        else:
+            regenerators = {
+                id(source.sampler): RenderVerifier(source.sampler.config, "regenerate") for source in sources
+            }
+        report = VerificationReport(Path(args.verify_report or Path(args.output) / "verification.jsonl"))
+
+    progress = ProgressReporter(
+        total=total_tasks,
+        mode=args.progress,
+        interval=args.progress_interval,
+        totals_by_type=(
+            {variant.name: len(variant.plan) for variant in variants} if variants else plan.counts_by_type()
+        ),
+    )
+    if progress.mode != "quiet":
+        metrics.add_stage_hook(progress)
+
+    if args.workers > 0 and not profiler:
+        _run_parallel(args, generator, plan, writer, progress, targets, sources, report, governor, say)
+    else:
+        if args.workers > 0:
+            say("🔬 --profile runs sequentially so stage attribution stays exact")
+        _run_sequential(targets, sources, progress, verifiers, regenerators, report, profiler, governor)
+
+    for _, target_writer in targets:
+        target_writer.close()
+    if args.catalog:
+        say("🗂️  Catalog: " + ", ".join(
+            str(target_writer.catalog.path) for _, target_writer in targets
+        ))
+    if report is not None:
+        report.close()
+        say(f"🔎 Verification: {report.counts['flagged']} flagged, "
+            f"{report.counts['regenerated']} regenerated (see {report.path})")
+    if governor is not None:
+        governor.record()
+        say(f"🧠 Memory: {governor.summary()}")
+        if governor.peak > governor.budget:
+            print("⚠️  Warning: peak memory exceeded the --max-memory budget")
+    if profiler:
+        profiler.close()
+        say(f"🔬 Profile ({profiler.tasks_profiled} tasks) written to {args.profile}/")
+    if args.metrics_json:
+        metrics.write_json(Path(args.metrics_json))
+    if args.metrics_prom:
+        metrics.write_prometheus(Path(args.metrics_prom), prefix=f"{config.domain}_")
+
+    if variants:
+        say(f"✅ Done! Generated {total_tasks} tasks in {len(variants)} variants in {args.output}/<name>/{config.domain}_task/")
+    elif args.resolutions:
+        say(f"✅ Done! Generated {len(plan)} tasks at {len(targets)} resolutions in {args.output}/<W>x<H>/{config.domain}_task/")
+    else:
+        say(f"✅ Done! Generated {len(plan)} tasks in {args.output}/{config.domain}_task/")
+
+
+if __name__ == "__main__":
+    main()
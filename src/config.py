@@ -7,9 +7,14 @@
 ╚══════════════════════════════════════════════════════════════════════════════╝
 """
 
-from pydantic import Field
+from typing import Literal, Optional
+
+from pydantic import Field, model_validator
 from core import GenerationConfig
 
+# instance_ids.png is 8-bit up to 255 objects and 16-bit above
+MAX_INSTANCE_IDS = 65535
+
 
 class TaskConfig(GenerationConfig):
     """
@@ -47,6 +52,28 @@ class TaskConfig(GenerationConfig):
         description="Video frame rate"
     )
     
+    animation_mode: Literal["sequential", "grouped", "rows"] = Field(
+        default="sequential",
+        description="Counting animation steps: one object at a time, highlight_group_size objects, or one image row at a time"
+    )
+    
+    highlight_group_size: int = Field(
+        default=5,
+        ge=1,
+        description="Objects highlighted together per step in the 'grouped' animation mode"
+    )
+    
+    max_video_frames: Optional[int] = Field(
+        default=None,
+        ge=3,
+        description="Cap on ground truth video frames: shorten hold/highlight timing, then merge steps (None = no cap)"
+    )
+    
+    video_size: Optional[tuple[int, int]] = Field(
+        default=None,
+        description="Ground truth video (width, height); animation frames are drawn at this size (None = image_size)"
+    )
+    
     # ══════════════════════════════════════════════════════════════════════════
     #  TASK-SPECIFIC SETTINGS
     # ══════════════════════════════════════════════════════════════════════════
@@ -82,6 +109,11 @@ class TaskConfig(GenerationConfig):
         description="Background color (RGB)"
     )
     
+    stroke_scale: float = Field(
+        default=1.0,
+        description="Multiplier for outline, highlight and text padding widths (set per resolution in multi-resolution runs)"
+    )
+    
     object_colors: list[tuple[int, int, int]] = Field(
         default_factory=lambda: [
             (255, 100, 100),  # Red
@@ -103,7 +135,26 @@ class TaskConfig(GenerationConfig):
         description="Minimum distance between objects (if no overlap)"
     )
     
+    near_duplicate_distance: int = Field(
+        default=0,
+        ge=0,
+        description="Reject tasks whose objects all lie within this many pixels (position and size) of a kept task's (0 = exact duplicates only)"
+    )
+    
     use_final_image: bool = Field(
         default=True,
         description="Whether to generate final_frame.png (showing count) or use goal.txt"
     )
+    
+    generate_annotations: bool = Field(
+        default=False,
+        description="Whether to write instance_ids.png (object ID per pixel; 16-bit above 255 objects) "
+                    "and annotations.json (bounding boxes)"
+    )
+    
+    @model_validator(mode="after")
+    def _check_instance_ids(self) -> "TaskConfig":
+        # Fail at configuration time rather than partway through a run
+        if self.generate_annotations and self.max_objects > MAX_INSTANCE_IDS:
+            raise ValueError(f"generate_annotations supports at most {MAX_INSTANCE_IDS} objects per task")
+        return self
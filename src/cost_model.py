@@ -0,0 +1,188 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                            TASK COST MODEL                                    ║
+║                                                                               ║
+║  Estimates the render + encode time of one sampled task, used to order and    ║
+║  chunk work for parallel runs (see core.scheduler).                           ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Calibrate on the machine that will run the job and reuse the result:
+
+    python -m src.cost_model --output cost_model.json
+    counting-objects-generate --total-tasks 100000 --workers 16 --cost-model cost_model.json
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .animation import plan_animation
+from .config import TaskConfig
+
+SHAPES = ["circle", "square", "triangle", "star"]
+
+FEATURES = [
+    "bias",                 # per-task constant
+    "megapixels",           # canvas allocation and fills
+    "final_image",          # final frame with count overlay (font rendering)
+    *[f"objects_{shape}" for shape in SHAPES],
+    "video_draws",          # highlight frames redraw every object: n * steps draws
+    "video_frame_mpx",      # encoder work: frames * megapixels
+]
+
+# Rough single-core priors (seconds), used until a calibrated model is loaded
+DEFAULT_COEFFICIENTS = {
+    "bias": 0.0005,
+    "megapixels": 0.002,
+    "final_image": 0.001,
+    "objects_circle": 0.00001,
+    "objects_square": 0.00001,
+    "objects_triangle": 0.000012,
+    "objects_star": 0.000015,
+    "video_draws": 0.000037,
+    "video_frame_mpx": 0.0055,
+}
+
+
+class CostModel:
+    """Linear cost model over task features, fitted with non-negative least squares."""
+
+    def __init__(self, coefficients: Optional[Dict[str, float]] = None):
+        self.coefficients = dict(DEFAULT_COEFFICIENTS)
+        if coefficients:
+            self.coefficients.update(coefficients)
+
+    @staticmethod
+    def features(task_data: dict, config: TaskConfig) -> Dict[str, float]:
+        """Feature vector of one sampled task under ``config``."""
+        n = task_data["num_objects"]
+        width, height = config.image_size
+        megapixels = width * height / 1e6
+        video_width, video_height = config.video_size or config.image_size
+        video_megapixels = video_width * video_height / 1e6
+        video = 1.0 if config.generate_videos else 0.0
+        animation = plan_animation(task_data, config) if video else None
+
+        values = {
+            "bias": 1.0,
+            "megapixels": megapixels,
+            "final_image": 1.0 if config.use_final_image else 0.0,
+            "video_draws": n * len(animation.steps) if video else 0.0,
+            "video_frame_mpx": animation.frame_count * video_megapixels if video else 0.0,
+        }
+        for shape in SHAPES:
+            values[f"objects_{shape}"] = 0.0
+        for shape in task_data["shapes"]:
+            key = f"objects_{shape}"
+            if key in values:
+                values[key] += 1.0
+        return values
+
+    def estimate(self, task_data: dict, config: TaskConfig) -> float:
+        """Estimated seconds to render and encode one task."""
+        features = self.features(task_data, config)
+        return sum(self.coefficients.get(name, 0.0) * value for name, value in features.items())
+
+    # ── persistence ──────────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        return {"features": FEATURES, "coefficients": self.coefficients}
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "CostModel":
+        return cls(json.loads(Path(path).read_text())["coefficients"])
+
+    # ── calibration ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def fit(cls, rows: List[Dict[str, float]], seconds: List[float]) -> "CostModel":
+        """Fit coefficients to measured samples (active-set non-negative least squares)."""
+        import numpy as np
+
+        X = np.array([[row[name] for name in FEATURES] for row in rows], dtype=float)
+        y = np.array(seconds, dtype=float)
+        active = [i for i in range(len(FEATURES)) if X[:, i].any()]
+        coef = np.zeros(len(FEATURES))
+        while active:
+            sol, *_ = np.linalg.lstsq(X[:, active], y, rcond=None)
+            if (sol >= 0).all():
+                coef[active] = sol
+                break
+            active = [i for i, c in zip(active, sol) if c > 0]
+        # Features never exercised by the samples keep their prior
+        fitted = {name: float(coef[i]) for i, name in enumerate(FEATURES) if X[:, i].any()}
+        return cls(fitted)
+
+    @classmethod
+    def calibrate(cls, config: TaskConfig, samples: int = 48, seed: int = 0) -> "CostModel":
+        """
+        Time ``samples`` tasks on this machine and fit the model.
+
+        Object counts, shapes, image size (the configured size and half of
+        it) and the video setting are varied so every feature is exercised.
+        Samples are drawn from the global random state seeded with ``seed``
+        (the generator samples through it); the caller's state is restored
+        afterwards.
+        """
+        from .generator import TaskGenerator
+
+        rng = random.Random(seed)
+        width, height = config.image_size
+        sizes = [(width, height), (max(64, width // 2), max(64, height // 2))]
+        videos = [False, True] if config.generate_videos else [False]
+        task_types = config.object_types + ["mixed"]
+
+        generators = {}
+        rows, seconds = [], []
+        state = random.getstate()
+        random.seed(seed)
+        try:
+            for i in range(samples):
+                size = sizes[i % len(sizes)]
+                video = videos[(i // len(sizes)) % len(videos)]
+                key = (size, video)
+                if key not in generators:
+                    variant = config.model_copy(update={
+                        "image_size": size,
+                        "generate_videos": video,
+                        "random_seed": None,
+                    })
+                    generators[key] = TaskGenerator(variant)
+                generator = generators[key]
+
+                task_data = generator.sample_task_data(task_type=rng.choice(task_types), unique=False)
+                start = time.perf_counter()
+                generator.encode_task(generator.render_task(f"calibration_{i:04d}", task_data))
+                seconds.append(time.perf_counter() - start)
+                rows.append(cls.features(task_data, generator.config))
+        finally:
+            random.setstate(state)
+
+        return cls.fit(rows, seconds)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the task cost model on this machine")
+    parser.add_argument("--output", type=str, default="cost_model.json", help="Where to save the model")
+    parser.add_argument("--samples", type=int, default=48, help="Number of timed sample tasks")
+    parser.add_argument("--no-videos", action="store_true", help="Calibrate without video generation")
+    args = parser.parse_args(argv)
+
+    config = TaskConfig(num_samples=0, generate_videos=not args.no_videos)
+    model = CostModel.calibrate(config, samples=args.samples)
+    model.save(Path(args.output))
+    for name, value in model.coefficients.items():
+        print(f"  {name:<18} {value * 1000:10.4f} ms")
+    print(f"✅ Saved cost model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                            RUN COST ESTIMATE                                  ║
+║                                                                               ║
+║  Generate a small sample of a plan and project wall time and disk usage.      ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+The sample is drawn from every segment of the plan in proportion to its
+size, rendered with the run's ``TaskConfig`` (and resolution targets), and
+written to a temporary directory that is removed afterwards. Stage timings
+come from the same ``Metrics`` stage timers a real run reports.
+
+Wall time for the staged pipeline is modelled per render worker count as
+its throughput bound: the slowest of the serial sampling step (main
+process), rendering spread over the workers, video encoding over the
+encode threads, writing over the write threads, and the total CPU work
+spread over the machine's cores. Sampling slows down as the unique-task
+space fills up, which a small sample cannot see, so treat projections
+for plans close to that size as lower bounds.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import OutputWriter
+from core.layout import TaskLayout, find_task_dir
+from core.metrics import Metrics
+from .config import TaskConfig
+from .generator import TaskGenerator
+from .multires import scale_task_data, tree_name
+from .plan import TaskPlan
+from .verifier import RenderVerifier
+
+# Stage timer name -> where it runs in the staged pipeline
+PIPELINE_STAGES = {
+    "data": "sample",
+    "signature": "sample",
+    "near_duplicates": "sample",
+    "render": "render",
+    "verify": "render",
+    "video": "encode",
+    "png": "encode",
+    "write": "write",
+    "catalog": "write",
+    "fsync": "write",
+}
+
+ARTIFACT_KINDS = {".png": "png", ".mp4": "mp4", ".avi": "mp4", ".txt": "text", ".json": "text"}
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    if days:
+        return f"{days}d{hours:02d}h"
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1000 or unit == "TB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size:.0f} B"
+        size /= 1000
+
+
+class RunEstimate:
+    """Per-task measurements from a sample, extrapolated to ``total_tasks``."""
+
+    def __init__(
+        self,
+        total_tasks: int,
+        sample_tasks: int,
+        stage_seconds: Dict[str, float],
+        bytes_per_task: Dict[str, float],
+        inodes_per_task: float,
+        fixed_inodes: int,
+    ):
+        self.total_tasks = total_tasks
+        self.sample_tasks = sample_tasks
+        self.stage_seconds = stage_seconds        # Mean seconds per task, by stage timer
+        self.bytes_per_task = bytes_per_task      # Mean bytes per task, by artifact kind
+        self.inodes_per_task = inodes_per_task    # Files and directories per task
+        self.fixed_inodes = fixed_inodes          # Top-level directories
+
+    def pipeline_seconds(self) -> Dict[str, float]:
+        """Per-task seconds grouped by pipeline stage (sample/render/encode/write)."""
+        grouped: Dict[str, float] = {}
+        for stage, seconds in self.stage_seconds.items():
+            group = PIPELINE_STAGES.get(stage, "render")
+            grouped[group] = grouped.get(group, 0.0) + seconds
+        return grouped
+
+    def wall_seconds(
+        self,
+        render_workers: int,
+        encode_workers: int = 2,
+        write_workers: int = 2,
+        cpus: Optional[int] = None,
+    ) -> Tuple[float, str]:
+        """Projected wall time and the bounding stage; 0 workers is sequential."""
+        per_task = self.pipeline_seconds()
+        if render_workers <= 0:
+            return sum(per_task.values()) * self.total_tasks, "sequential"
+        cpus = cpus or os.cpu_count() or 1
+        bounds = {
+            "sample": per_task.get("sample", 0.0),
+            "render": per_task.get("render", 0.0) / render_workers,
+            "encode": per_task.get("encode", 0.0) / max(1, encode_workers),
+            "write": per_task.get("write", 0.0) / max(1, write_workers),
+            "cpu": sum(per_task.values()) / cpus,
+        }
+        stage = max(bounds, key=bounds.get)
+        return bounds[stage] * self.total_tasks, stage
+
+    def total_bytes(self) -> Dict[str, float]:
+        return {kind: size * self.total_tasks for kind, size in self.bytes_per_task.items()}
+
+    def total_inodes(self) -> int:
+        return int(round(self.inodes_per_task * self.total_tasks)) + self.fixed_inodes
+
+    def to_dict(self, worker_counts: Sequence[int] = (), **pipeline) -> dict:
+        return {
+            "total_tasks": self.total_tasks,
+            "sample_tasks": self.sample_tasks,
+            "stage_seconds_per_task": self.stage_seconds,
+            "bytes_per_task": self.bytes_per_task,
+            "total_bytes": self.total_bytes(),
+            "total_inodes": self.total_inodes(),
+            "wall_seconds": {
+                str(workers): dict(zip(("seconds", "bound"), self.wall_seconds(workers, **pipeline)))
+                for workers in worker_counts
+            },
+        }
+
+    def report(self, worker_counts: Sequence[int], **pipeline) -> str:
+        """Human-readable projection for the given render worker counts."""
+        stages = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.stage_seconds.items())
+        totals = self.total_bytes()
+        disk = ", ".join(f"{kind} {_format_bytes(size)}" for kind, size in sorted(totals.items()))
+        lines = [
+            f"📐 Estimate for {self.total_tasks:,} tasks from a sample of {self.sample_tasks}:",
+            f"   per task: {stages}",
+            f"   disk:     {_format_bytes(sum(totals.values()))} ({disk}), {self.total_inodes():,} inodes",
+            "   wall time:",
+        ]
+        for workers in worker_counts:
+            seconds, bound = self.wall_seconds(workers, **pipeline)
+            label = "sequential" if workers <= 0 else f"--workers {workers}"
+            note = "" if workers <= 0 else f"  (bound: {bound})"
+            lines.append(f"     {label:<14} {_format_duration(seconds):>8}{note}")
+        return "\n".join(lines)
+
+
+def _sample_plan(plan: TaskPlan, sample_size: int) -> TaskPlan:
+    """
+    A plan of exactly ``sample_size`` tasks (at most ``len(plan)``), spread
+    over ``plan``'s segments in proportion, by largest remainder.
+    """
+    total = len(plan)
+    quotas = [sample_size * count / total for _, count in plan.segments]
+    counts = [int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(quotas)), key=lambda i: counts[i] - quotas[i])
+    for i in by_remainder[:sample_size - sum(counts)]:
+        counts[i] += 1
+    segments = [(task_type, n) for (task_type, _), n in zip(plan.segments, counts)]
+    return TaskPlan(plan.domain, segments, unique=plan.unique)
+
+
+def estimate_run(
+    config: TaskConfig,
+    plan: TaskPlan,
+    sample_size: int = 50,
+    targets: Optional[List[TaskConfig]] = None,
+    verify_mode: Optional[str] = None,
+    layout: Optional[TaskLayout] = None,
+) -> RunEstimate:
+    """
+    Generate about ``sample_size`` tasks of ``plan`` into a temporary
+    directory and extrapolate to the whole plan.
+
+    ``targets`` are the configs each sampled task is rendered with (one per
+    resolution, see ``src.multires``); by default just ``config``.
+    ``verify_mode`` includes render verification (``src.verifier``).
+    ``layout`` is the output's task directory layout; its bucket
+    directories are projected for the whole plan rather than per task.
+    """
+    layout = layout or TaskLayout()
+    targets = targets or [config]
+    sample = _sample_plan(plan, min(sample_size, len(plan)))
+    metrics = Metrics()
+    sampler = TaskGenerator(config, metrics=metrics)
+    renderers = [TaskGenerator(target, metrics=metrics) for target in targets]
+    verifiers = [RenderVerifier(target, "flag") for target in targets] if verify_mode == "flag" else None
+    regenerator = RenderVerifier(config, "regenerate") if verify_mode == "regenerate" else None
+
+    with tempfile.TemporaryDirectory(prefix="estimate_") as tmp:
+        root = Path(tmp)
+        writers = [
+            OutputWriter(
+                root / tree_name(target.image_size) if len(targets) > 1 else root,
+                metrics=metrics, layout=layout,
+            )
+            for target in targets
+        ]
+
+        def generate(planned) -> None:
+            task_data = sampler.sample_task_data(task_type=planned.task_type, unique=planned.unique)
+            if regenerator is not None:
+                task_data, _ = regenerator.regenerate(sampler, planned.task_id, task_data, unique=planned.unique)
+            for i, (renderer, writer) in enumerate(zip(renderers, writers)):
+                scaled = scale_task_data(task_data, config.image_size, renderer.config.image_size)
+                if verifiers:
+                    rendered, _ = verifiers[i].render(renderer, planned.task_id, scaled)
+                else:
+                    rendered = renderer.render_task(planned.task_id, scaled)
+                writer.write_task_pair(renderer.encode_task(rendered))
+
+        # One untimed task first: fonts, codecs and lazy imports load here
+        planned = list(sample)
+        generate(planned[0]._replace(task_id="warmup", unique=False))
+        metrics.snapshot(reset=True)
+        for item in planned:
+            generate(item)
+
+        bytes_by_kind: Dict[str, int] = {}
+        files = task_dirs = 0
+        # Sampled tasks are looked up by ID, as a reader of the tree would
+        # (bucket directories of hashed layouts are projected separately)
+        for writer in writers:
+            for item in planned:
+                task_dir = find_task_dir(writer.output_dir, config.domain, item.task_id)
+                if not task_dir.is_dir():
+                    continue
+                task_dirs += 1
+                for path in task_dir.iterdir():
+                    files += 1
+                    kind = ARTIFACT_KINDS.get(path.suffix, path.suffix.lstrip(".") or "other")
+                    bytes_by_kind[kind] = bytes_by_kind.get(kind, 0) + path.stat().st_size
+
+    count = len(planned)
+    # Top-level directories: one <domain>_task dir (plus one tree per resolution)
+    fixed_dirs = len(targets) * (2 if len(targets) > 1 else 1)
+    if layout.hashed:
+        # Bucket directories and the layout manifest, shared by all tasks of a tree
+        fixed_dirs += len(targets) * (round(layout.expected_buckets(len(plan))) + 1)
+    stage_seconds = {
+        hist["labels"]["stage"]: hist["sum"] / count
+        for hist in metrics.snapshot()["histograms"]
+        if hist["name"] == "stage_seconds"
+    }
+    return RunEstimate(
+        total_tasks=len(plan),
+        sample_tasks=count,
+        stage_seconds=stage_seconds,
+        bytes_per_task={kind: size / count for kind, size in sorted(bytes_by_kind.items())},
+        inodes_per_task=(files + task_dirs) / count,
+        fixed_inodes=fixed_dirs,
+    )
@@ -10,54 +10,201 @@ import random
 import math
 import tempfile
 import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional, Set
+from typing import Collection, List, NamedTuple, Tuple, Dict, Optional, Set
 from PIL import Image, ImageDraw, ImageFont
 
 from core import BaseGenerator, TaskPair, ImageRenderer
+from core.artifact_cache import ArtifactCache
+from core.metrics import Metrics
+from core.progress import ProgressReporter
 from core.video_utils import VideoGenerator
-from .config import TaskConfig
+from .animation import HIGHLIGHT_FRAMES, HOLD_FRAMES, AnimationPlan, max_steps, plan_animation
+from .config import MAX_INSTANCE_IDS, TaskConfig
+from .near_duplicates import NearDuplicateIndex
+from .plan import PlannedTask
 from .prompts import get_prompt
 
 
+# Bump whenever a drawing or animation change alters output pixels: it is
+# part of every artifact cache key, so cached PNGs/MP4s are invalidated
+RENDERER_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _count_font(font_size: int) -> ImageFont.ImageFont:
+    """Font for the count text, loaded once per size and process."""
+    try:
+        return ImageFont.truetype("arial.ttf", font_size)
+    except:
+        try:
+            return ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial.ttf", font_size)
+        except:
+            return ImageFont.load_default()
+
+
+class RenderedTask(NamedTuple):
+    """Output of the render stage: everything that needs CPU-bound drawing."""
+    task_id: str
+    task_data: dict
+    first_image: Image.Image
+    final_image: Optional[Image.Image]
+    frames: Optional[List[Image.Image]]  # Animation frames (None without video)
+    instance_ids: Optional[Image.Image] = None  # With config.generate_annotations
+    annotations: Optional[dict] = None
+    cached: Optional[Dict[str, str]] = None  # Pinned cache files (ArtifactCache.pin) when not rendered
+
+
 class TaskGenerator(BaseGenerator):
     """
     Counting objects task generator.
     
     Generates images with random numbers of objects (circles, squares, triangles, stars)
     and creates corresponding task pairs for counting.
+    
+    Pass a ``Metrics`` instance to record per-stage timings, placement
+    retries and signature collisions; by default metrics are disabled.
+    
+    With an ``ArtifactCache``, tasks whose images and video are all cached
+    (see ``artifact_keys``) are not drawn or encoded again; their entries
+    are pinned, and the writer moves the pins into place instead.
     """
     
-    def __init__(self, config: TaskConfig):
+    def __init__(
+        self,
+        config: TaskConfig,
+        metrics: Optional[Metrics] = None,
+        artifact_cache: Optional[ArtifactCache] = None,
+    ):
         super().__init__(config)
         self.renderer = ImageRenderer(image_size=config.image_size)
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.artifact_cache = artifact_cache
         
-        # Initialize video generator if enabled
-        self.video_generator = None
-        if config.generate_videos and VideoGenerator.is_available():
-            self.video_generator = VideoGenerator(fps=config.video_fps, output_format="mp4")
+        # Video generator is created on first use so that processes which
+        # only sample or render (e.g. pipeline render workers) never load cv2
+        self._video_generator: Optional[VideoGenerator] = None
+        # Draws animation frames at config.video_size (see video_renderer)
+        self._video_renderer: Optional["TaskGenerator"] = None
         
         # Track generated task signatures to ensure uniqueness
         self._generated_signatures: Set[str] = set()
+        
+        # And, with a distance set, near-identical layouts as well
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        if config.near_duplicate_distance:
+            self._near_duplicates = NearDuplicateIndex(config.near_duplicate_distance)
+    
+    @property
+    def video_generator(self) -> Optional[VideoGenerator]:
+        """Video generator if videos are enabled and OpenCV is available."""
+        if (self._video_generator is None and self.config.generate_videos
+                and VideoGenerator.is_available()):
+            self._video_generator = VideoGenerator(fps=self.config.video_fps, output_format="mp4")
+        return self._video_generator
+    
+    @property
+    def native_video_size(self) -> bool:
+        """Whether animation frames are drawn at a ``config.video_size`` other than ``image_size``."""
+        video_size = self.config.video_size
+        return video_size is not None and tuple(video_size) != tuple(self.config.image_size)
+    
+    @property
+    def video_renderer(self) -> "TaskGenerator":
+        """Generator drawing the animation frames: this one, or one at ``config.video_size``."""
+        if not self.native_video_size:
+            return self
+        if self._video_renderer is None:
+            from .multires import video_config
+            self._video_renderer = TaskGenerator(video_config(self.config), metrics=self.metrics)
+        return self._video_renderer
     
     def generate_task_pair(self, task_id: str, task_type: Optional[str] = None) -> TaskPair:
         """Generate one counting task pair."""
         
         # Generate task data (number of objects, positions, shapes, colors)
-        task_data = self._generate_task_data(task_type=task_type)
+        task_data = self.sample_task_data(task_type=task_type, unique=False)
         
-        # Render initial state image (with objects to count)
-        first_image = self._render_initial_state(task_data)
+        return self._build_task_pair(task_id, task_data)
+    
+    def _build_task_pair(self, task_id: str, task_data: dict) -> TaskPair:
+        """Render images, video and prompt for already-sampled task data."""
+        return self.encode_task(self.render_task(task_id, task_data))
+    
+    def render_task(self, task_id: str, task_data: dict) -> RenderedTask:
+        """
+        Render stage: draw the first/final images and animation frames.
         
-        # Render final state (showing count) or prepare text answer
-        final_image = None
-        if self.config.use_final_image:
-            final_image = self._render_final_state(task_data)
+        The scene is rasterised once per task: the final image is the count
+        overlay on a copy of it, and the animation reuses both images as
+        its opening and closing frames.
+        """
+        if self.artifact_cache is not None:
+            cached = self.artifact_cache.pin(self.artifact_keys(task_data))
+            if cached is not None:
+                self.metrics.incr("renders_skipped_total")
+                return RenderedTask(task_id, task_data, None, None, None, cached=cached)
+        
+        with self.metrics.stage("render"):
+            # Render initial state image (with objects to count), and the
+            # object ID buffer in the same drawing loop if annotations are on
+            instance_ids = annotations = None
+            if self.config.generate_annotations:
+                # 8-bit IDs up to 255 objects; beyond that drawn as 32-bit
+                # and stored as 16-bit ("I;16")
+                wide = task_data["num_objects"] > 255
+                instance_ids = Image.new("I" if wide else "L", self.config.image_size, 0)
+                first_image = self._render_initial_state(task_data, instance_ids=instance_ids)
+                annotations = self._instance_annotations(task_data, instance_ids)
+                if wide:
+                    instance_ids = instance_ids.convert("I;16")
+            else:
+                first_image = self._render_initial_state(task_data)
+            
+            # Render final state (showing count) or prepare text answer
+            final_image = None
+            if self.config.use_final_image:
+                final_image = self._render_final_state(task_data, scene=first_image)
+            
+            # Create frames showing counting animation (optional)
+            frames = None
+            if self.config.generate_videos and VideoGenerator.is_available():
+                if self.native_video_size:
+                    frames = self._create_video_size_frames(task_data)
+                else:
+                    frames = self._create_counting_animation_frames(
+                        task_data, base_frame=first_image, final_frame=final_image
+                    )
+        
+        return RenderedTask(task_id, task_data, first_image, final_image, frames, instance_ids, annotations)
+    
+    def rendered_image_count(self, task_data: dict) -> int:
+        """Number of distinct images ``render_task`` produces for ``task_data``."""
+        count = 2 if self.config.use_final_image else 1
+        if self.config.generate_videos and VideoGenerator.is_available():
+            # one highlighted frame per step (base and final frames are the
+            # images, unless the video has its own size)
+            count += max_steps(task_data["num_objects"], self.config)
+            if self.native_video_size:
+                count += 2 if self.config.use_final_image else 1
+        return count
+    
+    def encode_task(self, rendered: RenderedTask) -> TaskPair:
+        """Encode stage: encode the video and images into a TaskPair."""
+        task_id, task_data = rendered.task_id, rendered.task_data
+        keys = self.artifact_keys(task_data) if self.artifact_cache is not None else None
         
         # Generate video (optional - showing counting animation)
+        cached = dict(rendered.cached or {})
         video_path = None
-        if self.config.generate_videos and self.video_generator:
-            video_path = self._generate_video(first_image, task_data, task_id)
+        if rendered.frames and self.video_generator:
+            video_key = keys.get("ground_truth.mp4") if keys else None
+            pinned = self.artifact_cache.pin({"ground_truth.mp4": video_key}) if video_key else None
+            if pinned is not None:
+                cached.update(pinned)
+            else:
+                video_path = self._encode_video(rendered.frames, task_id)
         
         # Select prompt based on object shape with task data for detailed prompts
         object_shape = task_data.get("object_shape", "default")
@@ -68,15 +215,87 @@ class TaskGenerator(BaseGenerator):
         if not self.config.use_final_image:
             goal_text = str(task_data["num_objects"])
         
-        return TaskPair(
+        self.metrics.incr("tasks_generated_total", shape=object_shape)
+        
+        pair = TaskPair(
             task_id=task_id,
             domain=self.config.domain,
             prompt=prompt,
-            first_image=first_image,
-            final_image=final_image,
+            first_image=rendered.first_image,
+            final_image=rendered.final_image,
             ground_truth_video=video_path,
-            goal_text=goal_text
+            goal_text=goal_text,
+            instance_ids=rendered.instance_ids,
+            annotations=rendered.annotations,
+            artifact_keys=keys,
+            cached_files=cached or None,
+            metadata=self.catalog_metadata(task_data)
         )
+        
+        # Hand on PNG/MP4 bytes rather than pixels and a temp file: the
+        # writer stores them as they are, and queued pairs stay small
+        with self.metrics.stage("png"):
+            return pair.encode(unlink_video=True)
+    
+    def catalog_metadata(self, task_data: dict) -> dict:
+        """Catalog fields of a task (see ``core.catalog.TaskCatalog``): type, count and histograms."""
+        shapes: Dict[str, int] = {}
+        for shape in task_data["shapes"]:
+            shapes[shape] = shapes.get(shape, 0) + 1
+        colors: Dict[str, int] = {}
+        for color in task_data["colors"]:
+            name = "#%02x%02x%02x" % tuple(color)
+            colors[name] = colors.get(name, 0) + 1
+        return {
+            "task_type": task_data.get("object_shape"),
+            "num_objects": task_data["num_objects"],
+            "seed": self.config.random_seed,
+            "signature": self._get_task_signature(task_data),
+            "image_size": list(self.config.image_size),
+            "features": {"shape": shapes, "color": colors},
+        }
+    
+    def artifact_keys(self, task_data: dict) -> Dict[str, str]:
+        """
+        Cache key of each pixel artifact, from exactly the inputs it depends on.
+        
+        Prompts and answers are cheap text and always rewritten, so e.g. a
+        prompt wording change reuses every cached image and video.
+        """
+        scene = {
+            "renderer": RENDERER_VERSION,
+            "num_objects": task_data["num_objects"],
+            "objects": [task_data[name] for name in ("shapes", "colors", "positions", "sizes")],
+            "image_size": self.config.image_size,
+            "background_color": self.config.background_color,
+            "stroke_scale": self.config.stroke_scale,
+        }
+        keys = {"first_frame.png": ArtifactCache.key("first_frame", **scene)}
+        if self.config.use_final_image:
+            keys["final_frame.png"] = ArtifactCache.key("final_frame", **scene)
+        if self.config.generate_annotations:
+            keys["instance_ids.png"] = ArtifactCache.key("instance_ids", **scene)
+            keys["annotations.json"] = ArtifactCache.key("annotations", **scene)
+        if self.config.generate_videos and VideoGenerator.is_available():
+            keys["ground_truth.mp4"] = ArtifactCache.key(
+                "ground_truth", **scene,
+                use_final_image=self.config.use_final_image,
+                video_fps=self.config.video_fps,
+                **self._animation_key(),
+                **({"video_size": tuple(self.config.video_size)} if self.native_video_size else {}),
+            )
+        return keys
+    
+    def _animation_key(self) -> dict:
+        """Animation settings for the video key (none by default, so existing entries stay valid)."""
+        key = {}
+        if self.config.animation_mode != "sequential":
+            key["animation_mode"] = self.config.animation_mode
+            if self.config.animation_mode == "grouped":
+                key["highlight_group_size"] = self.config.highlight_group_size
+        if self.config.max_video_frames:
+            key["max_video_frames"] = self.config.max_video_frames
+        return key
     
     # ══════════════════════════════════════════════════════════════════════════
     #  TASK-SPECIFIC METHODS
@@ -187,54 +406,113 @@ class TaskGenerator(BaseGenerator):
         Returns:
             TaskPair if unique task was generated, None otherwise
         """
+        task_data = self.sample_task_data(task_type=task_type, max_attempts=max_attempts)
+        return self._build_task_pair(task_id, task_data)
+    
+    def sample_task_data(
+        self,
+        task_type: Optional[str] = None,
+        unique: bool = True,
+        max_attempts: int = 1000
+    ) -> dict:
+        """
+        Sample task data, rejecting signatures that were already generated.
+        
+        This is the only step that consumes the random state, so running it
+        sequentially keeps results reproducible however rendering is spread
+        across processes.
+        
+        Raises:
+            RuntimeError: If no unique task is found within max_attempts
+        """
+        if not unique:
+            with self.metrics.stage("data"):
+                return self._generate_task_data(task_type=task_type)
+        
         for attempt in range(max_attempts):
-            task_data = self._generate_task_data(task_type=task_type)
-            signature = self._get_task_signature(task_data)
+            with self.metrics.stage("data"):
+                task_data = self._generate_task_data(task_type=task_type)
+            with self.metrics.stage("signature"):
+                signature = self._get_task_signature(task_data)
             
             # Check if this task is unique
-            if signature not in self._generated_signatures:
-                self._generated_signatures.add(signature)
-                
-                # Render initial state image (with objects to count)
-                first_image = self._render_initial_state(task_data)
-                
-                # Render final state (showing count) or prepare text answer
-                final_image = None
-                if self.config.use_final_image:
-                    final_image = self._render_final_state(task_data)
-                
-                # Generate video (optional - showing counting animation)
-                video_path = None
-                if self.config.generate_videos and self.video_generator:
-                    video_path = self._generate_video(first_image, task_data, task_id)
-                
-                # Select prompt based on object shape with task data for detailed prompts
-                object_shape = task_data.get("object_shape", "default")
-                prompt = get_prompt("default", object_shape, task_data=task_data)
-                
-                # Prepare goal text (answer)
-                goal_text = None
-                if not self.config.use_final_image:
-                    goal_text = str(task_data["num_objects"])
-                
-                return TaskPair(
-                    task_id=task_id,
-                    domain=self.config.domain,
-                    prompt=prompt,
-                    first_image=first_image,
-                    final_image=final_image,
-                    ground_truth_video=video_path,
-                    goal_text=goal_text
-                )
+            if signature in self._generated_signatures:
+                self.metrics.incr("signature_collisions_total", task_type=task_type or "any")
+                continue
+            
+            # ... and not within config.near_duplicate_distance of a kept task
+            if self._near_duplicates is not None:
+                with self.metrics.stage("near_duplicates"):
+                    added = self._near_duplicates.add_if_new(task_data)
+                if not added:
+                    self.metrics.incr("near_duplicates_total", task_type=task_type or "any")
+                    continue
+            
+            self._generated_signatures.add(signature)
+            return task_data
         
         # Failed to generate unique task after max attempts
         raise RuntimeError(f"Failed to generate unique task after {max_attempts} attempts")
     
+    def resample_layout(self, task_data: dict, task_id: str, attempt: int) -> dict:
+        """
+        Copy of ``task_data`` with new positions and sizes (same objects).
+
+        Seeded from the config seed, ``task_id`` and ``attempt`` rather than
+        the shared random state, so the result is the same whichever process
+        calls it and the sampling sequence of later tasks is unaffected.
+        """
+        state = random.getstate()
+        try:
+            random.seed(f"{self.config.random_seed}:{task_id}:{attempt}")
+            num_objects = task_data["num_objects"]
+            resampled = dict(task_data)
+            resampled["positions"] = self._generate_positions(num_objects)
+            resampled["sizes"] = [
+                random.randint(self.config.object_size_range[0], self.config.object_size_range[1])
+                for _ in range(num_objects)
+            ]
+            return resampled
+        finally:
+            random.setstate(state)
+    
+    def replace_layout(self, task_data: dict, replacement: dict) -> bool:
+        """
+        Move ``task_data``'s uniqueness reservations over to ``replacement``.
+        
+        ``replacement`` goes through the same signature and near-duplicate
+        checks as ``sample_task_data``; if it is a duplicate of another
+        task nothing changes and False is returned. ``task_data`` must have
+        been sampled with ``unique=True``.
+        """
+        signature = self._get_task_signature(replacement)
+        if signature in self._generated_signatures:
+            self.metrics.incr("signature_collisions_total", task_type=replacement.get("object_shape") or "any")
+            return False
+        if self._near_duplicates is not None:
+            with self.metrics.stage("near_duplicates"):
+                self._near_duplicates.remove(task_data)
+                added = self._near_duplicates.add_if_new(replacement)
+                if not added:
+                    self._near_duplicates.add(task_data)
+            if not added:
+                self.metrics.incr("near_duplicates_total", task_type=replacement.get("object_shape") or "any")
+                return False
+        self._generated_signatures.discard(self._get_task_signature(task_data))
+        self._generated_signatures.add(signature)
+        return True
+
+    def generate_planned_task(self, planned: PlannedTask) -> TaskPair:
+        """Generate the task described by one ``TaskPlan`` entry."""
+        task_data = self.sample_task_data(task_type=planned.task_type, unique=planned.unique)
+        return self._build_task_pair(planned.task_id, task_data)
+    
     def generate_tasks_for_type(
         self, 
         task_type: str, 
         num_tasks: int,
-        task_id_prefix: Optional[str] = None
+        task_id_prefix: Optional[str] = None,
+        progress: Optional[ProgressReporter] = None
     ) -> List[TaskPair]:
         """
         Generate multiple unique tasks for a specific task type.
@@ -243,19 +521,23 @@ class TaskGenerator(BaseGenerator):
             task_type: Type of task (circle, square, triangle, star, mixed)
             num_tasks: Number of tasks to generate
             task_id_prefix: Optional prefix for task IDs
+            progress: Reporter to advance; a rate-limited one is created if None
             
         Returns:
             List of unique TaskPairs
         """
         tasks = []
         prefix = task_id_prefix or self.config.domain
+        reporter = progress or ProgressReporter(total=num_tasks, totals_by_type={task_type: num_tasks})
         
         for i in range(num_tasks):
             task_id = f"{prefix}_{task_type}_{i:04d}"
             task_pair = self.generate_unique_task_pair(task_id, task_type=task_type)
             tasks.append(task_pair)
-            print(f"  Generated: {task_id}")
+            reporter.advance(task_type=task_type)
         
+        if progress is None:
+            reporter.close()
         return tasks
     
     def _generate_positions(self, num_objects: int) -> List[Tuple[int, int]]:
@@ -263,10 +545,13 @@ class TaskGenerator(BaseGenerator):
         width, height = self.config.image_size
         positions = []
         max_attempts = 1000
+        total_attempts = 0
+        fallbacks = 0
         
         for i in range(num_objects):
             attempts = 0
             while attempts < max_attempts:
+                total_attempts += 1
                 # Random position
                 max_size = self.config.object_size_range[1]
                 x = random.randint(max_size // 2, width - max_size // 2)
@@ -289,16 +574,35 @@ class TaskGenerator(BaseGenerator):
             
             # If we couldn't find a valid position, use a random one anyway
             if len(positions) <= i:
+                fallbacks += 1
                 x = random.randint(max_size // 2, width - max_size // 2)
                 y = random.randint(max_size // 2, height - max_size // 2)
                 positions.append((x, y))
         
+        self.metrics.incr("placement_attempts_total", total_attempts)
+        self.metrics.incr("placement_fallbacks_total", fallbacks)
         return positions
     
-    def _render_initial_state(self, task_data: dict) -> Image.Image:
-        """Render image with objects to count."""
+    def _render_initial_state(
+        self,
+        task_data: dict,
+        instance_ids: Optional[Image.Image] = None
+    ) -> Image.Image:
+        """
+        Render image with objects to count.
+        
+        If ``instance_ids`` (an "L" image, or "I" for more than 255 objects)
+        is given, each object is also drawn into it, with the same geometry,
+        filled with its 1-based ID, so later objects occlude earlier ones
+        exactly as in the RGB image.
+        """
         img = Image.new("RGB", self.config.image_size, self.config.background_color)
         draw = ImageDraw.Draw(img)
+        id_draw = None
+        if instance_ids is not None:
+            if len(task_data["shapes"]) > (255 if instance_ids.mode == "L" else MAX_INSTANCE_IDS):
+                raise ValueError(f"A {instance_ids.mode} instance ID image holds too few object IDs")
+            id_draw = ImageDraw.Draw(instance_ids)
         
         shapes = task_data["shapes"]
         colors = task_data["colors"]
@@ -312,13 +616,70 @@ class TaskGenerator(BaseGenerator):
             size = sizes[i]
             
             self._draw_shape(draw, shape, x, y, size, color)
+            if id_draw is not None:
+                self._draw_shape(id_draw, shape, x, y, size, i + 1, outline=i + 1)
         
         return img
     
-    def _render_final_state(self, task_data: dict) -> Image.Image:
-        """Render final image showing the count."""
+    def _instance_annotations(self, task_data: dict, instance_ids: Image.Image) -> dict:
+        """
+        Visible bounding box and area of every object, from the ID buffer.
+        
+        Each object is measured only in the square around its placement
+        that contains all of its pixels, so the cost does not grow with the
+        image size.
+        """
+        width, height = instance_ids.size
+        pad = self._stroke(2) + 2
+        objects = []
+        for i, (shape, color, (x, y), size) in enumerate(zip(
+            task_data["shapes"], task_data["colors"], task_data["positions"], task_data["sizes"]
+        )):
+            object_id = i + 1
+            reach = size // 2 + pad
+            left, top = max(0, x - reach), max(0, y - reach)
+            region = instance_ids.crop((left, top, min(width, x + reach + 1), min(height, y + reach + 1)))
+            bbox = None
+            if region.mode == "L":
+                area = region.histogram()[object_id]
+                if area:
+                    lut = [0] * 256
+                    lut[object_id] = 255
+                    box = region.point(lut).getbbox()
+                    bbox = [left + box[0], top + box[1], left + box[2], top + box[3]]
+            else:
+                # Wide IDs: PIL histograms and lookup tables are 8-bit
+                import numpy as np
+                rows, cols = np.nonzero(np.asarray(region) == object_id)
+                area = int(rows.size)
+                if area:
+                    bbox = [left + int(cols.min()), top + int(rows.min()),
+                            left + int(cols.max()) + 1, top + int(rows.max()) + 1]
+            objects.append({
+                "id": object_id,
+                "shape": shape,
+                "color": list(color),
+                "center": [x, y],
+                "size": size,
+                "bbox": bbox,  # [x0, y0, x1, y1), None if fully occluded
+                "area": area,
+            })
+        return {
+            "image_size": [width, height],
+            "num_objects": task_data["num_objects"],
+            "instance_ids": "instance_ids.png",
+            "objects": objects,
+        }
+    
+    def _render_final_state(self, task_data: dict, scene: Optional[Image.Image] = None) -> Image.Image:
+        """
+        Render final image showing the count.
+        
+        ``scene`` is the task's already rendered initial image; the count
+        is drawn onto a copy of it instead of rendering the scene again.
+        """
         # Start with the initial image
-        img = self._render_initial_state(task_data)
+        img = scene.copy() if scene is not None else self._render_initial_state(task_data)
         draw = ImageDraw.Draw(img)
         
         # Add count text
@@ -326,14 +687,7 @@ class TaskGenerator(BaseGenerator):
         text = f"Count: {count}"
         
         # Get font
-        font_size = min(self.config.image_size) // 10
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
+        font = _count_font(min(self.config.image_size) // 10)
         
         # Calculate text position (center)
         bbox = draw.textbbox((0, 0), text, font=font)
@@ -344,7 +698,7 @@ class TaskGenerator(BaseGenerator):
         y = (self.config.image_size[1] - text_height) // 2
         
         # Draw text with background
-        padding = 10
+        padding = self._stroke(10)
         draw.rectangle(
             [x - padding, y - padding, x + text_width + padding, y + text_height + padding],
             fill=(255, 255, 255, 200)
@@ -353,6 +707,10 @@ class TaskGenerator(BaseGenerator):
         
         return img
     
+    def _stroke(self, width: int) -> int:
+        """A line width or margin in pixels, scaled by ``config.stroke_scale``."""
+        return max(1, round(width * self.config.stroke_scale))
+    
     def _draw_shape(
         self,
         draw: ImageDraw.Draw,
@@ -360,7 +718,8 @@ class TaskGenerator(BaseGenerator):
         center_x: int,
         center_y: int,
         size: int,
-        color: Tuple[int, int, int]
+        color: Tuple[int, int, int],
+        outline=(0, 0, 0)
     ):
         """Draw a shape at the given position."""
         half_size = size // 2
@@ -373,7 +732,7 @@ class TaskGenerator(BaseGenerator):
                 center_x + half_size,
                 center_y + half_size
             ]
-            draw.ellipse(bbox, fill=color, outline=(0, 0, 0), width=2)
+            draw.ellipse(bbox, fill=color, outline=outline, width=self._stroke(2))
         
         elif shape == "square":
             # Draw square
@@ -383,7 +742,7 @@ class TaskGenerator(BaseGenerator):
                 center_x + half_size,
                 center_y + half_size
             ]
-            draw.rectangle(bbox, fill=color, outline=(0, 0, 0), width=2)
+            draw.rectangle(bbox, fill=color, outline=outline, width=self._stroke(2))
         
         elif shape == "triangle":
             # Draw triangle (equilateral)
@@ -393,7 +752,7 @@ class TaskGenerator(BaseGenerator):
                 (center_x - half_size, center_y + height // 2),  # Bottom left
                 (center_x + half_size, center_y + height // 2),  # Bottom right
             ]
-            draw.polygon(points, fill=color, outline=(0, 0, 0), width=2)
+            draw.polygon(points, fill=color, outline=outline, width=self._stroke(2))
         
         elif shape == "star":
             # Draw star (5-pointed)
@@ -412,75 +771,93 @@ class TaskGenerator(BaseGenerator):
                 y = center_y + radius * math.sin(angle)
                 points.append((x, y))
             
-            draw.polygon(points, fill=color, outline=(0, 0, 0), width=2)
+            draw.polygon(points, fill=color, outline=outline, width=self._stroke(2))
     
-    def _generate_video(
-        self,
-        first_image: Image.Image,
-        task_data: dict,
-        task_id: str
-    ) -> Optional[str]:
-        """Generate ground truth video showing counting animation."""
+    def _encode_video(self, frames: List[Image.Image], task_id: str) -> Optional[str]:
+        """Encode the counting animation to a temporary ground truth video."""
         temp_dir = Path(tempfile.gettempdir()) / f"{self.config.domain}_videos"
         temp_dir.mkdir(parents=True, exist_ok=True)
-        video_path = temp_dir / f"{task_id}_ground_truth.mp4"
-        
-        # Create frames showing counting animation
-        frames = self._create_counting_animation_frames(task_data)
-        
-        result = self.video_generator.create_video_from_frames(
-            frames,
-            video_path
-        )
+        # Task IDs repeat across output trees (resolutions, sweep variants)
+        # that may be encoded concurrently, so the name includes the tree
+        tree = hashlib.md5(str(Path(self.config.output_dir).resolve()).encode()).hexdigest()[:8]
+        video_path = temp_dir / f"{task_id}_{tree}_ground_truth.mp4"
+        
+        with self.metrics.stage("video"):
+            result = self.video_generator.create_video_from_frames(
+                frames,
+                video_path
+            )
         
         return str(result) if result else None
     
     def _create_counting_animation_frames(
         self,
         task_data: dict,
-        hold_frames: int = 10,
-        highlight_frames: int = 5
+        hold_frames: int = HOLD_FRAMES,
+        highlight_frames: int = HIGHLIGHT_FRAMES,
+        base_frame: Optional[Image.Image] = None,
+        final_frame: Optional[Image.Image] = None,
+        plan: Optional[AnimationPlan] = None
     ) -> List[Image.Image]:
         """
         Create animation frames showing objects being counted one by one.
         
-        Each object is highlighted in sequence, then the final count is shown.
+        Objects are highlighted step by step (see ``src.animation`` for the
+        steps of each ``config.animation_mode`` and the ``max_video_frames``
+        cap), then the final count is shown.
+        ``base_frame`` and ``final_frame`` are the task's initial and final
+        images if already rendered; they are reused rather than redrawn.
+        A given ``plan`` replaces the steps and timing planned from
+        ``task_data``.
         """
         frames = []
-        num_objects = task_data["num_objects"]
-        shapes = task_data["shapes"]
-        colors = task_data["colors"]
-        positions = task_data["positions"]
-        sizes = task_data["sizes"]
+        if plan is None:
+            plan = plan_animation(task_data, self.config, hold_frames, highlight_frames)
+        hold_frames, highlight_frames = plan.hold_frames, plan.highlight_frames
         
         # Initial frame (all objects visible)
-        base_frame = self._render_initial_state(task_data)
+        if base_frame is None:
+            base_frame = self._render_initial_state(task_data)
         frames.extend([base_frame] * hold_frames)
         
-        # Highlight each object in sequence
-        for i in range(num_objects):
-            # Create frame with this object highlighted
+        # Highlight each step's objects in sequence
+        for step in plan.steps:
+            # Create frame with these objects highlighted
             highlighted_frame = self._render_frame_with_highlight(
-                task_data, i
+                task_data, step
             )
             frames.extend([highlighted_frame] * highlight_frames)
         
         # Final frame showing count
-        if self.config.use_final_image:
-            final_frame = self._render_final_state(task_data)
-        else:
+        if not self.config.use_final_image:
             final_frame = base_frame
+        elif final_frame is None:
+            final_frame = self._render_final_state(task_data, scene=base_frame)
         
         frames.extend([final_frame] * hold_frames)
         
         return frames
     
+    def _create_video_size_frames(self, task_data: dict) -> List[Image.Image]:
+        """
+        Animation frames drawn directly at ``config.video_size``.
+        
+        The objects are rescaled from the spec as in ``src.multires``;
+        the steps are planned on the unscaled task data, so they match
+        the frames a full-size video would show.
+        """
+        from .multires import scale_task_data
+        renderer = self.video_renderer
+        plan = plan_animation(task_data, self.config)
+        scaled = scale_task_data(task_data, self.config.image_size, renderer.config.image_size)
+        return renderer._create_counting_animation_frames(scaled, plan=plan)
+    
     def _render_frame_with_highlight(
         self,
         task_data: dict,
-        highlight_index: int
+        highlight_indices: Collection[int]
     ) -> Image.Image:
-        """Render a frame with one object highlighted."""
+        """Render a frame with the objects at ``highlight_indices`` highlighted."""
         img = Image.new("RGB", self.config.image_size, self.config.background_color)
         draw = ImageDraw.Draw(img)
         
@@ -488,6 +865,7 @@ class TaskGenerator(BaseGenerator):
         colors = task_data["colors"]
         positions = task_data["positions"]
         sizes = task_data["sizes"]
+        highlighted = set(highlight_indices)
         
         for i in range(len(shapes)):
             shape = shapes[i]
@@ -495,17 +873,17 @@ class TaskGenerator(BaseGenerator):
             x, y = positions[i]
             size = sizes[i]
             
-            # Highlight the selected object
-            if i == highlight_index:
+            # Highlight the selected objects
+            if i in highlighted:
                 # Draw highlight circle around object
-                highlight_size = size + 20
+                highlight_size = size + self._stroke(20)
                 highlight_bbox = [
                     x - highlight_size // 2,
                     y - highlight_size // 2,
                     x + highlight_size // 2,
                     y + highlight_size // 2
                 ]
-                draw.ellipse(highlight_bbox, outline=(255, 255, 0), width=4)
+                draw.ellipse(highlight_bbox, outline=(255, 255, 0), width=self._stroke(4))
                 # Make object brighter
                 bright_color = tuple(min(255, c + 50) for c in color)
                 self._draw_shape(draw, shape, x, y, size, bright_color)
@@ -536,14 +914,19 @@ class TaskGenerator(BaseGenerator):
             task_types = self.config.object_types + ["mixed"]
         
         all_tasks = []
+        reporter = ProgressReporter(
+            total=tasks_per_type * len(task_types),
+            totals_by_type={task_type: tasks_per_type for task_type in task_types}
+        )
         
         for task_type in task_types:
-            print(f"Generating {tasks_per_type} tasks for type: {task_type}")
             tasks = self.generate_tasks_for_type(
                 task_type=task_type,
                 num_tasks=tasks_per_type,
-                task_id_prefix=self.config.domain
+                task_id_prefix=self.config.domain,
+                progress=reporter
             )
             all_tasks.extend(tasks)
         
+        reporter.close()
         return all_tasks
@@ -0,0 +1,145 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          NEAR-DUPLICATE INDEX                                 ║
+║                                                                               ║
+║  Reject sampled tasks that are within a few pixels of one already kept.       ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Two task specs are near-duplicates at distance ``d`` if they have the same
+objects (the same multiset of shape/colour pairs) and the objects can be
+paired up, shape and colour matching, so that each pair's centres differ
+by at most ``d`` pixels along each axis and their sizes by at most ``d``.
+Exact signatures (``TaskGenerator._get_task_signature``) only catch
+``d = 0``.
+
+Lookup is grid-bucketed. Every spec is fingerprinted by its object
+multiset, and its objects of the rarest shape/colour pair in it (the
+anchor class, the same for every spec with that multiset) are put in a
+grid of ``2d``-pixel cells. A near-duplicate's anchor objects lie in the
+at most 2 x 2 cells around each of the query's anchor objects, so a
+query reads ``4 x anchors`` buckets, intersects the task sets found for
+each anchor object and checks the few survivors exactly. The cost of a
+query depends on the object count, not on the number of indexed tasks.
+Specs are kept packed (12 bytes per object) for that final check.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class NearDuplicateIndex:
+    """Grid-bucketed index of task specs for near-duplicate queries at ``distance`` pixels."""
+
+    def __init__(self, distance: int):
+        if distance < 1:
+            raise ValueError("near-duplicate distance must be at least 1 pixel")
+        self.distance = distance
+        self.cell = 2 * distance
+        self._buckets: Dict[int, list] = {}
+        self._specs: List[Optional[Tuple[tuple, bytes]]] = []  # (class counts, packed x/y/size by class)
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self._specs) - self._removed
+
+    def _fingerprint(self, task_data: dict):
+        """Object multiset, anchor objects and packed objects in canonical order."""
+        classes: Dict[tuple, list] = {}
+        for shape, color, (x, y), size in zip(
+            task_data["shapes"], task_data["colors"], task_data["positions"], task_data["sizes"]
+        ):
+            classes.setdefault((shape, tuple(color)), []).append((x, y, size))
+        order = sorted(classes)
+        counts = tuple((key, len(classes[key])) for key in order)
+        anchor = min(order, key=lambda key: (len(classes[key]), key))
+        packed = array("i", [value for key in order for obj in sorted(classes[key]) for value in obj])
+        return counts, classes[anchor], packed.tobytes()
+
+    def _bucket(self, multiset: int, x: int, y: int) -> int:
+        return hash((multiset, x // self.cell, y // self.cell))
+
+    def find(self, task_data: dict) -> Optional[int]:
+        """Index of a stored near-duplicate of ``task_data``, or None."""
+        counts, anchors, packed = self._fingerprint(task_data)
+        multiset = hash(counts)
+        d = self.distance
+        candidates = None
+        for x, y, _ in anchors:
+            found = set()
+            for cx in range((x - d) // self.cell, (x + d) // self.cell + 1):
+                for cy in range((y - d) // self.cell, (y + d) // self.cell + 1):
+                    found.update(self._buckets.get(hash((multiset, cx, cy)), ()))
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return None
+        for index in sorted(candidates):
+            if self._specs[index] is None:  # removed
+                continue
+            stored_counts, stored = self._specs[index]
+            if stored_counts == counts and self._matches(counts, packed, stored):
+                return index
+        return None
+
+    def add(self, task_data: dict) -> int:
+        """Index ``task_data``; returns its index."""
+        counts, anchors, packed = self._fingerprint(task_data)
+        multiset = hash(counts)
+        index = len(self._specs)
+        self._specs.append((counts, packed))
+        for key in {self._bucket(multiset, x, y) for x, y, _ in anchors}:
+            self._buckets.setdefault(key, []).append(index)
+        return index
+
+    def remove(self, task_data: dict) -> bool:
+        """Forget the entry for exactly ``task_data`` (e.g. a replaced layout); True if there was one."""
+        counts, anchors, packed = self._fingerprint(task_data)
+        x, y, _ = anchors[0]
+        for index in self._buckets.get(self._bucket(hash(counts), x, y), ()):
+            if self._specs[index] == (counts, packed):
+                self._specs[index] = None
+                self._removed += 1
+                return True
+        return False
+
+    def add_if_new(self, task_data: dict) -> bool:
+        """Index ``task_data`` unless it is a near-duplicate; True if it was added."""
+        if self.find(task_data) is not None:
+            return False
+        self.add(task_data)
+        return True
+
+    def _matches(self, counts: tuple, a: bytes, b: bytes) -> bool:
+        """Whether the objects of two specs with the same multiset pair up within the distance."""
+        first, second = array("i"), array("i")
+        first.frombytes(a)
+        second.frombytes(b)
+        d = self.distance
+        start = 0
+        for _, count in counts:
+            objs_a = [first[i:i + 3] for i in range(start, start + 3 * count, 3)]
+            objs_b = [second[i:i + 3] for i in range(start, start + 3 * count, 3)]
+            start += 3 * count
+            near = [
+                [j for j, q in enumerate(objs_b)
+                 if abs(p[0] - q[0]) <= d and abs(p[1] - q[1]) <= d and abs(p[2] - q[2]) <= d]
+                for p in objs_a
+            ]
+            if not _perfect_matching(near, count):
+                return False
+        return True
+
+
+def _perfect_matching(near: List[List[int]], count: int) -> bool:
+    """Whether every left node can be paired with a distinct right node (Kuhn's algorithm)."""
+    match = [-1] * count
+
+    def augment(i: int, seen: List[bool]) -> bool:
+        for j in near[i]:
+            if not seen[j]:
+                seen[j] = True
+                if match[j] < 0 or augment(match[j], seen):
+                    match[j] = i
+                    return True
+        return False
+
+    return all(near[i] and augment(i, [False] * count) for i in range(count))
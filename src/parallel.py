@@ -0,0 +1,369 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          PARALLEL GENERATION                                  ║
+║                                                                               ║
+║  Runs a TaskPlan through core.pipeline.StagedPipeline:                        ║
+║    sample (main process) → render (process pool) → encode (threads)           ║
+║    → write (threads)                                                          ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Sampling and deduplication stay in the main process, in plan order, so a
+seeded parallel run produces exactly the same tasks as a sequential one.
+Only the render order changes: with ``schedule="lpt"`` each window of
+sampled tasks is reordered longest-estimated-first (``src.cost_model``)
+and cheap tasks are chunked together (``core.scheduler``).
+
+Rendered pixels travel back through a shared-memory ``FrameRing`` rather
+than being pickled through the pool's pipes: the parent leases slots for
+each job, the worker copies every distinct image into them once, and the
+encode stage reads the slots in place (video frames go to the encoder as
+array views) before returning them. When the ring is full, or disabled
+with ``shm_mb=0``, a task falls back to the pickled transport.
+
+Several render/write targets (``src.multires``) share each sampled task:
+it is rescaled and rendered once per target, and counted as done when
+every target has written it. Several plan sources (``src.sweep``) share
+one pool: their tasks are sampled one source after another and
+rendered by the same warm workers.
+
+With ``verify_mode="flag"`` each task is verified in the render worker
+that drew it; mismatch records travel back with the result and are
+logged by the encode stage. ``"regenerate"`` verifies and re-places
+layouts while sampling instead, so replacements pass the same uniqueness
+checks, in plan order, as sampled tasks.
+
+Under a ``MemoryGovernor`` budget the pipeline's in-flight and queue
+bounds shrink while the process tree (parent and render workers) is near
+the budget; workers report their per-stage memory peaks to the parent.
+"""
+
+import multiprocessing
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from core import OutputWriter
+from core.artifact_cache import ArtifactCache
+from core.frame_ring import FrameRing
+from core.memory import MemoryGovernor, StageMemory
+from core.metrics import Metrics
+from core.pipeline import StagedPipeline
+from core.progress import ProgressReporter, WorkerProgress
+from core.scheduler import schedule as lpt_schedule
+from .config import TaskConfig
+from .cost_model import CostModel
+from .generator import RenderedTask, TaskGenerator
+from .multires import scale_task_data
+from .plan import PlanSource, TaskPlan
+from .verifier import RenderVerifier, VerificationReport
+
+# Per-process state of render workers (set by _init_render_worker)
+_worker_generators: List[TaskGenerator] = []
+_worker_metrics: Optional[Metrics] = None
+_worker_progress: Optional[WorkerProgress] = None
+_worker_ring: Optional[FrameRing] = None
+_worker_verifiers: List[RenderVerifier] = []
+_worker_memory: Optional[StageMemory] = None
+
+
+class SharedFrames(NamedTuple):
+    """A RenderedTask whose images were written to FrameRing slots."""
+    task_id: str
+    task_data: dict
+    slots: List[int]              # Slots holding the distinct images, in order
+    shapes: List[Tuple[int, int, int]]  # (height, width, 3) of each slot's image
+    first_image: int              # Index into ``slots``
+    final_image: Optional[int]
+    frames: Optional[List[int]]   # One index per animation frame (repeats allowed)
+    instance_ids: Optional[Image.Image] = None  # Small "L" image, pickled as is
+    annotations: Optional[dict] = None
+
+
+def _init_render_worker(
+    configs: List[TaskConfig],
+    metrics_enabled: bool,
+    progress: Optional[WorkerProgress],
+    ring_spec: Optional[tuple] = None,
+    artifact_cache: Optional[ArtifactCache] = None,
+    verify_mode: Optional[str] = None,
+    memory_trace_every: Optional[int] = None,
+) -> None:
+    global _worker_generators, _worker_metrics, _worker_progress, _worker_ring, _worker_verifiers
+    global _worker_memory
+    _worker_metrics = Metrics(enabled=metrics_enabled)
+    _worker_generators = [
+        TaskGenerator(config, metrics=_worker_metrics, artifact_cache=artifact_cache)
+        for config in configs
+    ]
+    _worker_progress = progress
+    if progress is not None:
+        _worker_metrics.add_stage_hook(progress)
+    _worker_memory = StageMemory(memory_trace_every) if memory_trace_every is not None else None
+    if _worker_memory is not None:
+        _worker_metrics.add_stage_hook(_worker_memory)
+    _worker_ring = FrameRing.attach(ring_spec) if ring_spec is not None else None
+    _worker_verifiers = [RenderVerifier(config, verify_mode) for config in configs] if verify_mode else []
+
+
+def _pack_frames(rendered: RenderedTask, slots: List[int]):
+    """Copy each distinct image of ``rendered`` into ``slots`` (once per image)."""
+    images: List[Image.Image] = []
+    index = {}
+
+    def ref(image: Image.Image) -> int:
+        key = id(image)
+        if key not in index:
+            index[key] = len(images)
+            images.append(image)
+        return index[key]
+
+    first = ref(rendered.first_image)
+    final = ref(rendered.final_image) if rendered.final_image is not None else None
+    frames = [ref(frame) for frame in rendered.frames] if rendered.frames else None
+
+    # (video frames may be smaller than the images, see config.video_size)
+    shapes = [(image.size[1], image.size[0], 3) for image in images]
+    if len(images) > len(slots) or any(
+        image.mode != "RGB" or not _worker_ring.fits(shape) for image, shape in zip(images, shapes)
+    ):
+        return rendered  # doesn't fit the lease: pickle it instead
+    used = slots[:len(images)]
+    for slot, image in zip(used, images):
+        _worker_ring.write(slot, image)
+    return SharedFrames(
+        rendered.task_id, rendered.task_data, used, shapes, first, final, frames,
+        rendered.instance_ids, rendered.annotations,
+    )
+
+
+def _render_chunk(jobs: List[Tuple[str, str, dict, int, Optional[List[int]]]]) -> list:
+    """Render a chunk of tasks; metric deltas and memory peaks ride along with the last one."""
+    results = []
+    for label, task_id, task_data, target, slots in jobs:
+        generator = _worker_generators[target]
+        record = None
+        if _worker_verifiers:
+            rendered, record = _worker_verifiers[target].render(generator, task_id, task_data)
+        else:
+            rendered = generator.render_task(task_id, task_data)
+        if slots is not None and _worker_ring is not None and rendered.first_image is not None:
+            rendered = _pack_frames(rendered, slots)
+        results.append((label, target, rendered, None, slots, record))
+    if (_worker_metrics.enabled or _worker_memory is not None) and results:
+        label, target, rendered, _, slots, record = results[-1]
+        stats = {
+            "metrics": _worker_metrics.snapshot(reset=True) if _worker_metrics.enabled else None,
+            "memory": _worker_memory.take() if _worker_memory is not None else None,
+        }
+        results[-1] = (label, target, rendered, stats, slots, record)
+    if _worker_progress is not None:
+        _worker_progress.flush()
+    return results
+
+
+def _unpack_frames(ring: FrameRing, shared: SharedFrames) -> RenderedTask:
+    """Rebuild a RenderedTask reading the ring in place.
+
+    The first/final images are copied into PIL images (they outlive the
+    lease, until the write stage); animation frames stay array views and
+    must be consumed before the slots are released.
+    """
+    views = [ring.view(slot, shape) for slot, shape in zip(shared.slots, shared.shapes)]
+    first_image = Image.fromarray(views[shared.first_image])
+    final_image = Image.fromarray(views[shared.final_image]) if shared.final_image is not None else None
+    frames = [views[i] for i in shared.frames] if shared.frames is not None else None
+    return RenderedTask(
+        shared.task_id, shared.task_data, first_image, final_image, frames,
+        shared.instance_ids, shared.annotations,
+    )
+
+
+def run_parallel(
+    generator: TaskGenerator,
+    plan: TaskPlan,
+    writer: OutputWriter,
+    progress: ProgressReporter,
+    render_workers: int,
+    encode_workers: int = 2,
+    write_workers: int = 2,
+    queue_size: int = 16,
+    schedule: str = "lpt",
+    schedule_window: int = 512,
+    cost_model: Optional[CostModel] = None,
+    shm_mb: int = 256,
+    targets: Optional[List[Tuple[TaskGenerator, OutputWriter]]] = None,
+    verify_mode: Optional[str] = None,
+    verify_report: Optional[VerificationReport] = None,
+    governor: Optional[MemoryGovernor] = None,
+    sources: Optional[List[PlanSource]] = None,
+) -> StagedPipeline:
+    """
+    Generate and write every task of ``plan`` through a staged pipeline.
+
+    ``schedule`` is ``"plan"`` (render one task at a time in plan order) or
+    ``"lpt"`` (cost-ordered chunks over windows of ``schedule_window`` tasks).
+    ``shm_mb`` bounds the shared-memory frame ring (0 disables it).
+    ``targets`` lists the (renderer, writer) pairs every task is emitted
+    to, by default just ``(generator, writer)``; ``generator`` always does
+    the sampling. ``verify_mode`` (``"flag"`` or ``"regenerate"``) verifies
+    each render in the workers, or re-places failing layouts while
+    sampling, logging mismatches to ``verify_report``.
+    ``governor`` keeps the run under a memory budget (the frame ring is
+    then also capped at a quarter of it). ``sources`` replaces ``plan``
+    with several plans, each sampled by its own generator and emitted to
+    its own targets (``generator``, ``plan`` and ``writer`` are then only
+    defaults for ``targets``).
+
+    Returns the finished pipeline so callers can report ``queue_stats()``.
+    """
+    metrics = generator.metrics
+    context = multiprocessing.get_context("spawn")  # stage threads are already running
+    worker_progress = progress.worker_handle(context) if progress.mode != "quiet" else None
+    targets = targets or [(generator, writer)]
+    sources = sources or [PlanSource(generator, plan, list(range(len(targets))))]
+    owner = {}      # target index -> source index (task IDs are unique per source)
+    remaining = {}  # (source index, task_id) -> targets not yet written
+    # Regenerate mode re-places failing layouts while sampling, in plan
+    # order and through the uniqueness checks; only flag mode verifies in
+    # the render workers
+    regenerators = {}
+    if verify_mode == "regenerate":
+        regenerators = {
+            number: RenderVerifier(source.sampler.config, "regenerate") for number, source in enumerate(sources)
+        }
+
+    def jobs() -> Iterator[Tuple[str, str, dict, int]]:
+        for number, source in enumerate(sources):
+            source.sampler.reseed()  # each source samples as it would in a run of its own
+            reference_size = source.sampler.config.image_size
+            for planned in source.plan:
+                task_data = source.sampler.sample_task_data(task_type=planned.task_type, unique=planned.unique)
+                if number in regenerators:
+                    task_data, record = regenerators[number].regenerate(
+                        source.sampler, planned.task_id, task_data, unique=planned.unique
+                    )
+                    if verify_report is not None:
+                        verify_report.add(record)
+                label = source.label or planned.task_type or "random"
+                remaining[number, planned.task_id] = len(source.targets)
+                for index in source.targets:
+                    owner[index] = number
+                    scaled = scale_task_data(task_data, reference_size, targets[index][0].config.image_size)
+                    yield label, planned.task_id, scaled, index
+
+    if schedule == "lpt":
+        model = cost_model if cost_model is not None else CostModel()
+        chunks = lpt_schedule(
+            jobs(),
+            cost_fn=lambda job: model.estimate(job[2], targets[job[3]][0].config),
+            window=schedule_window,
+        )
+    elif schedule == "plan":
+        chunks = ([job] for job in jobs())
+    else:
+        raise ValueError(f"Unknown schedule {schedule!r}; expected 'plan' or 'lpt'")
+
+    ring = None
+    ring_bytes = shm_mb * 1024 * 1024
+    if governor is not None:
+        ring_bytes = min(ring_bytes, governor.budget // 4)
+    if render_workers > 0 and ring_bytes > 0:
+        width, height = max(
+            (size for target, _ in targets for size in (target.config.image_size, target.config.video_size) if size),
+            key=lambda s: s[0] * s[1],
+        )
+        ring = FrameRing.create(
+            (height, width, 3),
+            ring_bytes,
+            min_slots=max(
+                target.rendered_image_count({"num_objects": target.config.max_objects}) for target, _ in targets
+            ),
+        )
+
+    def leased(chunks: Iterator[list]) -> Iterator[list]:
+        # Runs at submit time, so slots are only held by jobs in the pipeline
+        for chunk in chunks:
+            yield [
+                (label, task_id, task_data, target,
+                 ring.try_acquire(targets[target][0].rendered_image_count(task_data)) if ring is not None else None)
+                for label, task_id, task_data, target in chunk
+            ]
+
+    def discard(chunk: list) -> None:
+        for job in chunk:
+            if job[4] is not None:
+                ring.release(job[4])
+
+    def encode(item: tuple) -> tuple:
+        label, target, rendered, stats, slots, record = item
+        if stats is not None:
+            if stats["metrics"] is not None:
+                metrics.merge(stats["metrics"])
+            if stats["memory"] is not None and governor.stages is not None:
+                governor.stages.merge(stats["memory"])
+        if verify_report is not None:
+            verify_report.add(record)
+        try:
+            if isinstance(rendered, SharedFrames):
+                metrics.incr("frame_transport_tasks_total", transport="shm")
+                rendered = _unpack_frames(ring, rendered)
+            else:
+                metrics.incr("frame_transport_tasks_total", transport="pickle")
+            return label, target, targets[target][0].encode_task(rendered)
+        finally:
+            if slots is not None:
+                ring.release(slots)
+
+    def write(item: tuple) -> tuple:
+        label, target, pair = item
+        targets[target][1].write_task_pair(pair)
+        return label, (owner[target], pair.task_id)
+
+    def complete(result: tuple) -> None:
+        label, key = result
+        remaining[key] -= 1
+        if not remaining[key]:
+            del remaining[key]
+            progress.advance(task_type=label)
+
+    def on_tick(depths: dict) -> None:
+        progress.set_queue_depths(depths)
+        progress.poll()
+
+    pipeline = StagedPipeline(
+        render_fn=_render_chunk,
+        encode_fn=encode,
+        write_fn=write,
+        render_workers=render_workers,
+        encode_workers=encode_workers,
+        write_workers=write_workers,
+        queue_size=queue_size,
+        initializer=_init_render_worker,
+        initargs=(
+            [target.config for target, _ in targets], metrics.enabled, worker_progress,
+            ring.spec if ring else None, generator.artifact_cache, "flag" if verify_mode == "flag" else None,
+            governor.stages.trace_every if governor is not None and governor.stages is not None else None,
+        ),
+        mp_context=context,
+        metrics=metrics,
+        batched=True,
+        discard_fn=discard if ring is not None else None,
+        governor=governor,
+    )
+    try:
+        pipeline.run(
+            leased(chunks),
+            on_complete=complete,
+            on_tick=on_tick,
+        )
+    finally:
+        if ring is not None:
+            metrics.gauge("frame_ring_slots", ring.slots)
+            metrics.gauge("frame_ring_slots_peak", ring.peak_in_use)
+            ring.close()
+
+    for stage, stats in pipeline.queue_stats().items():
+        metrics.gauge("pipeline_queue_capacity", stats["capacity"], stage=stage)
+        metrics.gauge("pipeline_queue_depth_mean", stats["mean"], stage=stage)
+        metrics.gauge("pipeline_queue_depth_max", stats["max"], stage=stage)
+    return pipeline
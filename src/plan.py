@@ -0,0 +1,94 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                              TASK PLANNING                                    ║
+║                                                                               ║
+║  The ordered list of task IDs and task types a run will produce.              ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .config import TaskConfig
+
+if TYPE_CHECKING:
+    from .generator import TaskGenerator
+
+
+class PlannedTask(NamedTuple):
+    """One task to generate."""
+    index: int                 # Position in the plan
+    task_id: str
+    task_type: Optional[str]   # Shape name, "mixed", or None (legacy random mode)
+    unique: bool               # Deduplicate against earlier tasks by signature
+
+
+class TaskPlan:
+    """
+    Lazily enumerated task plan.
+
+    Stored as ``(task_type, count)`` segments so that million-task plans do
+    not materialise a list; iterating yields ``PlannedTask`` entries in the
+    same order (and with the same IDs) as the sequential generator methods.
+    """
+
+    def __init__(self, domain: str, segments: List[Tuple[Optional[str], int]], unique: bool = True):
+        self.domain = domain
+        self.segments = [(task_type, count) for task_type, count in segments if count > 0]
+        self.unique = unique
+
+    @classmethod
+    def total(cls, config: TaskConfig, total_tasks: int) -> "TaskPlan":
+        """``total_tasks`` distributed across all task types (remainder to the first types)."""
+        task_types = config.object_types + ["mixed"]
+        per_type, remainder = divmod(total_tasks, len(task_types))
+        return cls(config.domain, [
+            (task_type, per_type + (1 if i < remainder else 0))
+            for i, task_type in enumerate(task_types)
+        ])
+
+    @classmethod
+    def per_type(cls, config: TaskConfig, tasks_per_type: int) -> "TaskPlan":
+        """``tasks_per_type`` tasks for every task type."""
+        task_types = config.object_types + ["mixed"]
+        return cls(config.domain, [(task_type, tasks_per_type) for task_type in task_types])
+
+    @classmethod
+    def legacy(cls, config: TaskConfig, num_samples: int) -> "TaskPlan":
+        """Legacy ``--num-samples`` mode: random task types, no deduplication."""
+        return cls(config.domain, [(None, num_samples)], unique=False)
+
+    def task_id(self, task_type: Optional[str], i: int) -> str:
+        if task_type is None:
+            return f"{self.domain}_{i:04d}"
+        return f"{self.domain}_{task_type}_{i:04d}"
+
+    def counts_by_type(self) -> Dict[str, int]:
+        """Planned number of tasks per task type."""
+        counts: Dict[str, int] = {}
+        for task_type, count in self.segments:
+            key = task_type or "random"
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def __len__(self) -> int:
+        return sum(count for _, count in self.segments)
+
+    def __iter__(self) -> Iterator[PlannedTask]:
+        index = 0
+        for task_type, count in self.segments:
+            for i in range(count):
+                yield PlannedTask(index, self.task_id(task_type, i), task_type, self.unique)
+                index += 1
+
+
+class PlanSource(NamedTuple):
+    """
+    A plan together with the generator that samples it and the render
+    targets (indices into a run's ``(generator, writer)`` list) that every
+    sampled task is emitted to. ``label`` replaces the task type in
+    progress reports (e.g. a sweep variant name).
+    """
+    sampler: "TaskGenerator"
+    plan: TaskPlan
+    targets: List[int]
+    label: Optional[str] = None
@@ -0,0 +1,118 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                             CONFIG SWEEPS                                     ║
+║                                                                               ║
+║  Several TaskConfig variants generated in one process (and one worker         ║
+║  pool), each into its own output tree.                                        ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+A sweep spec is JSON (or YAML, if PyYAML is installed): either a list of
+variants or an object with shared ``defaults`` and a ``variants`` list.
+Each variant is a flat mapping of ``TaskConfig`` field overrides plus
+optional ``name`` (its output subdirectory, default ``variant_00``...)
+and plan keys ``total_tasks`` / ``tasks_per_type`` / ``num_samples``
+(default: the command line's)::
+
+    {
+      "defaults": {"random_seed": 42},
+      "variants": [
+        {"name": "small", "object_size_range": [20, 40], "total_tasks": 500},
+        {"name": "few", "max_objects": 5},
+        {"name": "text_answer", "use_final_image": false}
+      ]
+    }
+
+Variants run one after another through the same process or render
+pool: imports, fonts and codecs are loaded once, and progress and
+metrics are reported for the whole sweep.
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, List, NamedTuple
+
+from .config import TaskConfig
+from .plan import TaskPlan
+
+
+class SweepVariant(NamedTuple):
+    """One configuration of a sweep and the plan it generates."""
+    name: str
+    config: TaskConfig
+    plan: TaskPlan
+
+
+def load_spec(path: Path) -> dict:
+    """Read a sweep spec file into ``{"defaults": {...}, "variants": [...]}``."""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required for YAML sweep specs (pip install pyyaml), or use JSON")
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    if isinstance(spec, list):
+        spec = {"variants": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("variants"), list) or not spec["variants"]:
+        raise ValueError(f"{path}: expected a list of variants or an object with a 'variants' list")
+    spec.setdefault("defaults", {})
+    return spec
+
+
+def build_variants(
+    spec: dict,
+    base: dict,
+    output: Path,
+    default_plan: Callable[[TaskConfig], TaskPlan],
+) -> List[SweepVariant]:
+    """
+    Validate every variant of ``spec`` into a ``TaskConfig`` and plan.
+
+    ``base`` holds config fields set from the command line; spec
+    ``defaults`` and then each variant override them. Each variant writes
+    to ``output / name`` unless it sets ``output_dir``. ``default_plan``
+    builds the plan of a variant without plan keys.
+    """
+    variants = []
+    for i, entry in enumerate(spec["variants"]):
+        fields = {**base, **spec["defaults"], **entry}
+        name = str(fields.pop("name", f"variant_{i:02d}"))
+        plan_keys = {key: fields.pop(key) for key in ("total_tasks", "tasks_per_type") if key in fields}
+        if "num_samples" in fields:  # also a TaskConfig field
+            plan_keys["num_samples"] = fields["num_samples"]
+        fields.setdefault("num_samples", 0)
+        fields.setdefault("output_dir", Path(output) / name)
+        try:
+            config = TaskConfig(**fields)
+        except ValueError as exc:
+            raise ValueError(f"Sweep variant {name!r}: {exc}") from None
+        variants.append(SweepVariant(name, config, _variant_plan(config, plan_keys, default_plan)))
+
+    names = [variant.name for variant in variants]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate sweep variant names: {', '.join(duplicates)}")
+    return variants
+
+
+def _variant_plan(config: TaskConfig, plan_keys: dict, default_plan: Callable[[TaskConfig], TaskPlan]) -> TaskPlan:
+    if "total_tasks" in plan_keys:
+        return TaskPlan.total(config, int(plan_keys["total_tasks"]))
+    if "tasks_per_type" in plan_keys:
+        return TaskPlan.per_type(config, int(plan_keys["tasks_per_type"]))
+    if "num_samples" in plan_keys:
+        return TaskPlan.legacy(config, int(plan_keys["num_samples"]))
+    return default_plan(config)
+
+
+def load_variants(
+    path: Path,
+    base: dict,
+    output: Path,
+    default_plan: Callable[[TaskConfig], TaskPlan],
+) -> List[SweepVariant]:
+    """``build_variants`` for the spec file at ``path``."""
+    return build_variants(load_spec(path), base, output, default_plan)
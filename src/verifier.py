@@ -0,0 +1,160 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                            RENDER VERIFICATION                                ║
+║                                                                               ║
+║  Checks that each rendered first_image visibly shows num_objects objects.     ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Placement falls back to overlapping positions when it runs out of
+attempts, and ``allow_overlap=True`` permits overlaps outright, so a label
+can disagree with what is visible. The verifier counts connected
+foreground components (pixels differing from the background colour,
+8-connected, ignoring specks) with OpenCV; objects that touch or overlap
+merge into one component and the task is reported.
+
+Modes:
+    flag        - keep the task, log it to the verification report
+    regenerate  - re-place the task's objects (same count, shapes and
+                  colours, so label balance is kept; seeded from the seed
+                  and task ID) until it verifies or attempts run out, then
+                  flag
+
+Flag mode verifies wherever rendering runs (``render``), so in pipeline
+mode it is spread across the render worker processes. Regenerate mode
+verifies at sampling time instead (``regenerate``), in plan order: each
+replacement layout must pass the same signature and near-duplicate
+checks as a freshly sampled task, and only the first image is drawn per
+attempt; the task is rendered in full once, afterwards.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from core.video_utils import CV2_AVAILABLE
+from .config import TaskConfig
+
+MODES = ("off", "flag", "regenerate")
+
+
+class RenderVerifier:
+    """Count visibly separable objects in rendered images."""
+
+    def __init__(self, config: TaskConfig, mode: str = "flag", max_attempts: int = 10):
+        if mode not in MODES:
+            raise ValueError(f"Unknown verify mode {mode!r}; expected one of {MODES}")
+        if not CV2_AVAILABLE:
+            raise ImportError("opencv-python is required for render verification")
+        import cv2
+        import numpy as np
+        self._cv2, self._np = cv2, np
+
+        self.mode = mode
+        self.max_attempts = max_attempts
+        self._background = np.array(config.background_color, dtype=np.uint8)
+        # Ignore specks under 5% of the smallest object's area
+        min_size = config.object_size_range[0] * config.stroke_scale
+        self.min_area = max(4, int(0.05 * min_size * min_size))
+
+    def visible_count(self, image: Image.Image) -> int:
+        """Number of foreground components of at least ``min_area`` pixels."""
+        cv2 = self._cv2
+        mask = cv2.inRange(self._np.asarray(image), self._background, self._background)
+        cv2.bitwise_not(mask, mask)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        return int((stats[1:, cv2.CC_STAT_AREA] >= self.min_area).sum())
+
+    def render(self, generator, task_id: str, task_data: dict) -> Tuple[object, Optional[dict]]:
+        """
+        Render a task with ``generator`` and verify it (flag mode).
+
+        Returns the ``RenderedTask`` and a report record, or None if the
+        task verified. A task reused from the artifact cache is verified
+        from its cached first frame, so a rerun reports the same tasks.
+        """
+        rendered = generator.render_task(task_id, task_data)
+        with generator.metrics.stage("verify"):
+            if rendered.first_image is None:
+                with Image.open(rendered.cached["first_frame.png"]) as image:
+                    visible = self.visible_count(image.convert("RGB"))
+            else:
+                visible = self.visible_count(rendered.first_image)
+        return rendered, self._record(generator, task_id, task_data["num_objects"], visible, 0)
+
+    def regenerate(
+        self,
+        generator,
+        task_id: str,
+        task_data: dict,
+        unique: bool = True,
+    ) -> Tuple[dict, Optional[dict]]:
+        """
+        Verify freshly sampled ``task_data`` and re-place its objects until it verifies.
+
+        Call it on the sampling generator, right after ``sample_task_data``
+        (``unique`` as passed there): a replacement layout is kept only if
+        ``generator.replace_layout`` accepts it as unique, which also moves
+        the task's recorded signature over to it. Each attempt draws only
+        the first image. If no attempt verifies, the sampled layout is kept
+        and flagged.
+
+        Returns the task data to render and a report record, or None if
+        the task verified first time.
+        """
+        expected = task_data["num_objects"]
+        with generator.metrics.stage("verify"):
+            visible = self.visible_count(generator._render_initial_state(task_data))
+        attempts = 0
+        while visible != expected and attempts < self.max_attempts:
+            attempts += 1
+            candidate = generator.resample_layout(task_data, task_id, attempts)
+            with generator.metrics.stage("verify"):
+                candidate_visible = self.visible_count(generator._render_initial_state(candidate))
+            if candidate_visible != expected:
+                continue
+            if unique and not generator.replace_layout(task_data, candidate):
+                continue
+            task_data, visible = candidate, candidate_visible
+        return task_data, self._record(generator, task_id, expected, visible, attempts)
+
+    @staticmethod
+    def _record(generator, task_id: str, expected: int, visible: int, attempts: int) -> Optional[dict]:
+        """Count the verification; a report record unless it passed first time."""
+        generator.metrics.incr("verified_tasks_total")
+        if visible == expected and attempts == 0:
+            return None
+        status = "regenerated" if visible == expected else "flagged"
+        generator.metrics.incr("verification_mismatches_total", result=status)
+        return {
+            "task_id": task_id,
+            "status": status,
+            "label": expected,
+            "visible": visible,
+            "attempts": attempts,
+            "image_size": list(generator.config.image_size),
+        }
+
+
+class VerificationReport:
+    """Thread-safe JSON-lines log of tasks that failed verification."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w")
+        self._lock = threading.Lock()
+        self.counts = {"flagged": 0, "regenerated": 0}
+
+    def add(self, record: Optional[dict]) -> None:
+        if record is None:
+            return
+        with self._lock:
+            self.counts[record["status"]] += 1
+            self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()